@@ -0,0 +1,333 @@
+"""Headless benchmarks of the load, aggregate, render and report pipeline
+
+Synthetic CSVs are generated once per scale and shape (from a fixed seed,
+so every machine benchmarks the same data) and each pipeline stage is timed
+with engine.PerfRecorder. Results are written as JSON and can be compared
+with a saved baseline:
+
+    python benchmark.py --scales 10k,100k --output results.json
+    python benchmark.py --baseline results.json --threshold 0.2
+
+The comparison exits with status 1 when any stage got slower than the
+baseline by more than the threshold.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    ColumnStore,
+    FrameCache,
+    PerfRecorder,
+    build_report,
+    default_cache_dir,
+    format_bytes,
+    ingest_csv,
+    prepare_chart_data,
+    render_chart_image,
+    summarize_column,
+)
+
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SCALES = ["10k", "100k", "1m"]
+SHAPES = ["narrow", "wide"]
+# Extra numeric columns of the wide shape, on top of the narrow ones
+WIDE_EXTRA_COLUMNS = 50
+LOW_CARDINALITY = 12
+# The high-cardinality X column has one value per this many rows
+ROWS_PER_CUSTOMER = 10
+GENERATE_CHUNK_ROWS = 1_000_000
+# Bump when the generator changes so old data files are not reused
+DATA_VERSION = 1
+SEED = 20240601
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+# Stages faster than this are too noisy to flag as regressions
+DEFAULT_MIN_SECONDS = 0.01
+
+CHARTS = {
+    "low": {'x_col': "region", 'y_col': "revenue", 'agg_func': "sum", 'chart_type': "Bar"},
+    "high": {'x_col': "customer", 'y_col': "revenue", 'agg_func': "mean", 'chart_type': "Line"},
+}
+HISTOGRAM = {'x_col': "", 'y_col': "revenue", 'agg_func': "sum", 'chart_type': "Histogram"}
+
+
+def default_data_dir():
+    return os.path.join(default_cache_dir(), "benchmark")
+
+
+def dataset_path(data_dir, scale, shape):
+    return os.path.join(data_dir, f"bench_v{DATA_VERSION}_{scale}_{shape}.csv")
+
+
+def generate_dataset(path, rows, shape):
+    """Write a synthetic sales CSV of the given size and shape, chunk by chunk
+
+    Columns: date, region (low cardinality), customer (high cardinality),
+    revenue, quantity and, for the wide shape, WIDE_EXTRA_COLUMNS metrics.
+    The same rows and shape always produce the same file.
+    """
+    rng = np.random.default_rng([SEED, rows, SHAPES.index(shape)])
+    regions = np.array([f"Region {i:02d}" for i in range(LOW_CARDINALITY)])
+    customers = max(1, rows // ROWS_PER_CUSTOMER)
+    start = np.datetime64("2020-01-01")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        for offset in range(0, rows, GENERATE_CHUNK_ROWS):
+            n = min(GENERATE_CHUNK_ROWS, rows - offset)
+            chunk = {
+                'date': (start + rng.integers(0, 4 * 365, n).astype("timedelta64[D]")).astype(str),
+                'region': regions[rng.integers(0, LOW_CARDINALITY, n)],
+                'customer': np.char.add("C", rng.integers(0, customers, n).astype(str)),
+                'revenue': rng.gamma(2.0, 50.0, n).round(2),
+                'quantity': rng.integers(1, 20, n),
+            }
+            if shape == "wide":
+                for i in range(WIDE_EXTRA_COLUMNS):
+                    chunk[f"metric_{i:02d}"] = rng.normal(100, 15, n).round(3)
+            pd.DataFrame(chunk).to_csv(tmp_path, mode="a", header=offset == 0, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def ensure_dataset(data_dir, scale, shape):
+    """Path of the dataset for scale and shape, generating it on first use"""
+    path = dataset_path(data_dir, scale, shape)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {os.path.basename(path)}...", file=sys.stderr)
+        generate_dataset(path, SCALES[scale], shape)
+    return path
+
+
+def open_hidden_root():
+    """A withdrawn Tk root for timing the data table, or None without a display"""
+    try:
+        import tkinter as tk
+    except ImportError:
+        return None
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+
+def run_case(path, perf, repeat, root=None):
+    """Time every stage on one dataset, repeat times each
+
+    Records land in perf; the data is reloaded for each repetition so no
+    stage sees warm caches from the previous one.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+        _run_case(path, perf, repeat, root, scratch)
+
+
+def _run_case(path, perf, repeat, root, scratch):
+    cache = FrameCache(directory=scratch)
+    for _ in range(repeat):
+        with perf.stage("parse") as record:
+            df = ingest_csv(path)
+            record['rows'] = len(df)
+        with perf.stage("cache write", rows=len(df)):
+            cache.store(path, df)
+        with perf.stage("cache read") as record:
+            record['rows'] = len(cache.load(path))
+        with perf.stage("column load") as record:
+            columns, _ = ColumnStore(path).read(["region", "revenue"])
+            record['rows'] = len(columns)
+
+        if root is not None:
+            from datavisualiser import VirtualTable
+            table = VirtualTable(root)
+            with perf.stage("table", rows=len(df)):
+                table.set_frame(df)
+                root.update_idletasks()
+            with perf.stage("table sort", rows=len(df)):
+                table.sort_by("revenue")
+                root.update_idletasks()
+            table.tree.destroy()
+            table.scroll_x.destroy()
+            table.scroll_y.destroy()
+
+        images = {}
+        for cardinality, spec in CHARTS.items():
+            with perf.stage(f"aggregate/{cardinality}", rows=len(df)):
+                data = prepare_chart_data(df, spec)
+            buffer = io.BytesIO()
+            with perf.stage(f"render/{cardinality}", rows=len(data)):
+                render_chart_image(spec, data, buffer)
+            images[cardinality] = (spec, data, buffer.getvalue())
+
+        with perf.stage("statistics", rows=len(df)):
+            summarize_column(df[HISTOGRAM['y_col']])
+
+        spec, data, image = images["low"]
+        report_path = os.path.join(scratch, "report.pdf")
+        with perf.stage("report", rows=len(data)):
+            build_report(report_path, dict(spec, data=data), os.path.basename(path), len(df), chart_image=image)
+        del df
+
+
+def summarize_records(records):
+    """{stage: fastest run} from a case's records, keeping wall/CPU time, peak memory and rows"""
+    stages = {}
+    for record in records:
+        best = stages.get(record['stage'])
+        if best is None or record['wall_s'] < best['wall_s']:
+            stages[record['stage']] = {
+                key: record[key] for key in ('wall_s', 'cpu_s', 'peak_bytes', 'rows')
+            }
+    return stages
+
+
+def run_benchmarks(scales, shapes, data_dir, repeat=DEFAULT_REPEAT, trace_memory=False):
+    """Run every scale and shape, returning the results document"""
+    root = open_hidden_root()
+    if root is None:
+        print("No display: skipping the data table stages", file=sys.stderr)
+    context = PerfRecorder().context
+    cases = {}
+    try:
+        for scale in scales:
+            for shape in shapes:
+                path = ensure_dataset(data_dir, scale, shape)
+                name = f"{scale}-{shape}"
+                print(f"Running {name} ({format_bytes(os.path.getsize(path))})...", file=sys.stderr)
+                # A recorder per case, keeping every repetition's records
+                perf = PerfRecorder(trace_memory=trace_memory, max_records=None)
+                run_case(path, perf, repeat, root=root)
+                perf.set_trace_memory(False)
+                cases[name] = summarize_records(perf.snapshot())
+    finally:
+        if root is not None:
+            root.destroy()
+    return {
+        'created': datetime.now().isoformat(timespec="seconds"),
+        'context': context,
+        'repeat': repeat,
+        'trace_memory': trace_memory,
+        'data_version': DATA_VERSION,
+        'cases': cases,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """Compare wall times with a baseline, returning (rows, regressions)
+
+    rows are (case, stage, baseline_s, current_s, ratio) for every stage
+    both runs have; regressions are those slower than baseline by more than
+    threshold (a fraction), ignoring stages under min_seconds in both runs.
+    """
+    rows = []
+    regressions = []
+    for case, stages in results['cases'].items():
+        for stage, current in stages.items():
+            previous = baseline.get('cases', {}).get(case, {}).get(stage)
+            if previous is None:
+                continue
+            before = previous['wall_s']
+            after = current['wall_s']
+            ratio = after / before if before > 0 else float("inf")
+            row = (case, stage, before, after, ratio)
+            rows.append(row)
+            if ratio > 1 + threshold and max(before, after) >= min_seconds:
+                regressions.append(row)
+    return rows, regressions
+
+
+def format_results(results):
+    lines = [f"{'case':<14}{'stage':<18}{'wall ms':>11}{'cpu ms':>11}{'peak':>11}{'rows':>13}"]
+    for case, stages in results['cases'].items():
+        for stage, timing in stages.items():
+            peak = "" if timing['peak_bytes'] is None else format_bytes(timing['peak_bytes'])
+            rows = "" if timing['rows'] is None else f"{timing['rows']:,}"
+            lines.append(
+                f"{case:<14}{stage:<18}{timing['wall_s'] * 1000:>11,.1f}{timing['cpu_s'] * 1000:>11,.1f}"
+                f"{peak:>11}{rows:>13}"
+            )
+    return "\n".join(lines)
+
+
+def format_comparison(rows, regressions):
+    flagged = set(regressions)
+    lines = [f"{'case':<14}{'stage':<18}{'baseline ms':>13}{'current ms':>13}{'change':>9}"]
+    for row in rows:
+        case, stage, before, after, ratio = row
+        mark = "  REGRESSION" if row in flagged else ""
+        lines.append(
+            f"{case:<14}{stage:<18}{before * 1000:>13,.1f}{after * 1000:>13,.1f}{(ratio - 1) * 100:>+8.0f}%{mark}"
+        )
+    return "\n".join(lines)
+
+
+def _scales_argument(text):
+    scales = [scale.strip().lower() for scale in text.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scale {', '.join(unknown)} (choose from {', '.join(SCALES)})")
+    return scales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline on synthetic CSVs.")
+    parser.add_argument(
+        "--scales", type=_scales_argument, default=DEFAULT_SCALES, metavar="LIST",
+        help=f"comma-separated row counts to run, from {', '.join(SCALES)} (default: {','.join(DEFAULT_SCALES)})"
+    )
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="comma-separated shapes: narrow, wide")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per stage; the fastest is kept")
+    parser.add_argument("--data-dir", default=default_data_dir(), help="where generated CSVs are kept")
+    parser.add_argument("--memory", action="store_true", help="also record peak memory per stage (slower)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"fail when a stage is this much slower than the baseline (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=DEFAULT_MIN_SECONDS,
+        help=f"ignore stages faster than this in both runs (default: {DEFAULT_MIN_SECONDS})"
+    )
+    args = parser.parse_args(argv)
+
+    shapes = [shape.strip() for shape in args.shapes.split(",") if shape.strip()]
+    unknown = [shape for shape in shapes if shape not in SHAPES]
+    if unknown:
+        parser.error(f"unknown shape {', '.join(unknown)}")
+
+    results = run_benchmarks(args.scales, shapes, args.data_dir, repeat=max(1, args.repeat), trace_memory=args.memory)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get('trace_memory', False) != args.memory:
+            # tracemalloc slows every stage down, so such runs do not compare
+            print("Warning: only one of the runs traced memory; timings are not comparable", file=sys.stderr)
+        rows, regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        print()
+        print(format_comparison(rows, regressions))
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than the baseline by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
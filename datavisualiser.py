@@ -1,21 +1,368 @@
 
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import pandas as pd
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from datetime import datetime
+import numpy as np
+import io
 import os
+import queue
+import threading
+
+from engine import (
+    AGG_FUNCS,
+    CHART_TYPES,
+    LINE_POINTS_PER_PIXEL,
+    PERF_LOG_ENV,
+    RESAMPLE_UNITS,
+    SCATTER_POINTS_PER_PIXEL,
+    SOURCE_COLUMN,
+    WORKSPACE_SUFFIX,
+    AggregationCache,
+    ColumnStore,
+    FileReplaced,
+    FileTail,
+    FrameCache,
+    OperationCancelled,
+    PerfRecorder,
+    auto_resample_unit,
+    build_report,
+    chart_columns,
+    chart_spec,
+    chart_title,
+    concat_chunks,
+    dataset_profile,
+    describe_sources,
+    draw_chart,
+    expand_sources,
+    extend_aggregates,
+    filter_columns,
+    filter_mask,
+    filtered_version,
+    format_bytes,
+    format_filters,
+    group_key,
+    infer_column_plan,
+    load_dataset_snapshot,
+    load_preview,
+    load_sources,
+    load_workspace,
+    memory_report,
+    parse_filters,
+    perf_stage,
+    prepare_chart_data,
+    render_chart_image,
+    render_dashboard,
+    restore_aggregates,
+    save_workspace,
+    seed_profile_summaries,
+    should_stream,
+    stream_chart_data,
+    summarize_column,
+)
+
+
+class BackgroundJob:
+    """Run a function on a worker thread and deliver its results on the Tk thread
+
+    The target is called as target(job). It may call job.report(...) to send
+    progress and should check job.cancel_event between units of work. All
+    callbacks are invoked from the Tk main loop via root.after polling, so
+    they can safely touch widgets.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, root, target, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        self.root = root
+        self.target = target
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.cancel_event = threading.Event()
+        self.finished = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report(self, *args):
+        """Send progress to the Tk thread (called from the worker)"""
+        self._queue.put(("progress", args))
+
+    def _run(self):
+        try:
+            result = self.target(self)
+        except OperationCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
+
+    def _poll(self):
+        latest_progress = None
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Only the most recent progress update matters
+                latest_progress = payload
+                continue
+            self.finished = True
+            if kind == "done" and self.on_done:
+                self.on_done(payload)
+            elif kind == "error" and self.on_error:
+                self.on_error(payload)
+            elif kind == "cancelled" and self.on_cancel:
+                self.on_cancel()
+            return
+
+        if latest_progress is not None and self.on_progress and not self.cancel_event.is_set():
+            self.on_progress(*latest_progress)
+        self.root.after(self.POLL_MS, self._poll)
+
+
+class TimedCanvas(FigureCanvasTkAgg):
+    """Tk chart canvas that times every full render as a "render" stage"""
+
+    def __init__(self, figure, master=None, perf=None):
+        self.perf = perf
+        super().__init__(figure, master=master)
+
+    def draw(self):
+        with perf_stage(self.perf, "render"):
+            super().draw()
+
+
+class VirtualTable:
+    """Treeview that only holds the rows around the visible window
+
+    Rows are pulled from the DataFrame by position as the view scrolls,
+    so the number of Treeview items stays constant no matter how many
+    rows the dataset has.
+    """
+
+    OVERSCAN = 50
+    DEFAULT_ROW_HEIGHT = 20
+    HEADING_HEIGHT = 25
+
+    def __init__(self, parent):
+        self.df = None
+        self.order = None
+        self.sort_col = None
+        self.sort_ascending = True
+        self.top = 0
+        self.visible = 1
+        self.buf_start = 0
+        self.buf_rows = 0
+        self._placing = False
+
+        self.scroll_y = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scroll_x = ttk.Scrollbar(parent, orient=tk.HORIZONTAL)
+
+        self.tree = ttk.Treeview(
+            parent,
+            yscrollcommand=self._on_tree_yview,
+            xscrollcommand=self.scroll_x.set,
+            show="tree headings"
+        )
+        self.scroll_x.config(command=self.tree.xview)
+
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+
+    @property
+    def row_count(self):
+        return 0 if self.df is None else len(self.df)
+
+    def set_frame(self, df):
+        """Show a new DataFrame, resetting scroll position and sort order"""
+        self.df = df
+        self.order = None
+        self.sort_col = None
+        self.sort_ascending = True
+        self.top = 0
+
+        self.tree.delete(*self.tree.get_children())
+        self.buf_start = 0
+        self.buf_rows = 0
+
+        self.tree["columns"] = list(df.columns)
+        self.tree["show"] = "headings"
+        for col in df.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=100, anchor=tk.W)
+
+        self._fill(0)
+        self._place()
+
+    def refresh(self):
+        """Re-read the buffered rows, e.g. after the frame grew"""
+        if self.df is None:
+            return
+        self._fill(self.buf_start)
+        self._place()
+
+    def sort_by(self, col):
+        """Sort the view by a column without touching the underlying frame"""
+        if self.df is None:
+            return
+        if self.sort_col == col:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_col = col
+            self.sort_ascending = True
+
+        self.order = self._sorted_order()
+
+        for c in self.df.columns:
+            arrow = ""
+            if c == col:
+                arrow = " ▲" if self.sort_ascending else " ▼"
+            self.tree.heading(c, text=f"{c}{arrow}")
+
+        self._fill(max(0, self.top - self.OVERSCAN))
+        self._place()
+
+    def _sorted_order(self):
+        values = self.df[self.sort_col].reset_index(drop=True)
+        try:
+            ordered = values.sort_values(ascending=self.sort_ascending, kind="mergesort", na_position="last")
+        except TypeError:
+            # Mixed types in an object column - fall back to string order
+            ordered = values.astype(str).sort_values(ascending=self.sort_ascending, kind="mergesort")
+        return ordered.index.to_numpy()
+
+    def extend_frame(self, df):
+        """Show a frame that grew at the end, keeping the scroll position and sort"""
+        self.df = df
+        if self.sort_col is not None:
+            self.order = self._sorted_order()
+        self.refresh()
+
+    def jump_to(self, row):
+        """Scroll so that the given 0-based display row is at the top and select it"""
+        if self.row_count == 0:
+            return
+        row = min(max(row, 0), self.row_count - 1)
+        self.scroll_to(row)
+        items = self.tree.get_children()
+        offset = row - self.buf_start
+        if 0 <= offset < len(items):
+            self.tree.selection_set(items[offset])
+            self.tree.focus(items[offset])
+
+    def scroll_to(self, top):
+        """Make `top` the first visible row, refilling the buffer if needed"""
+        top = min(max(top, 0), max(0, self.row_count - self.visible))
+        self.top = top
+        if self._needs_refill():
+            self._fill(max(0, top - self.OVERSCAN))
+        self._place()
+
+    def _needs_refill(self):
+        buf_end = self.buf_start + self.buf_rows
+        guard = self.OVERSCAN // 2
+        if self.buf_rows < min(self.row_count, self.visible):
+            return True
+        if self.top < self.buf_start + guard and self.buf_start > 0:
+            return True
+        if self.top + self.visible > buf_end - guard and buf_end < self.row_count:
+            return True
+        return False
+
+    def _fill(self, start):
+        """Load rows [start, start + visible + 2 * OVERSCAN) into the Treeview"""
+        stop = min(self.row_count, start + self.visible + 2 * self.OVERSCAN)
+        if self.order is not None:
+            positions = self.order[start:stop]
+        else:
+            positions = np.arange(start, stop)
+        rows = self.df.iloc[positions].to_numpy(dtype=object)
+
+        # Reuse existing items rather than deleting and re-inserting them
+        items = self.tree.get_children()
+        for i, row in enumerate(rows):
+            if i < len(items):
+                self.tree.item(items[i], values=list(row))
+            else:
+                self.tree.insert("", tk.END, values=list(row))
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        self.buf_start = start
+        self.buf_rows = len(rows)
+
+    def _place(self):
+        """Scroll the Treeview so that self.top is the first visible item"""
+        self._placing = True
+        try:
+            if self.buf_rows:
+                self.tree.yview_moveto((self.top - self.buf_start) / self.buf_rows)
+        finally:
+            self._placing = False
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = self.row_count
+        if total == 0:
+            self.scroll_y.set(0, 1)
+            return
+        self.scroll_y.set(self.top / total, min(1.0, (self.top + self.visible) / total))
+
+    def _on_tree_yview(self, first, last):
+        # Native scrolling (mouse wheel, keyboard) moves inside the buffer;
+        # translate that back to a dataset position and refill near the edges
+        if self._placing or self.buf_rows == 0:
+            return
+        self.top = self.buf_start + int(round(float(first) * self.buf_rows))
+        if self._needs_refill():
+            self.scroll_to(self.top)
+        else:
+            self._update_scrollbar()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count))
+        elif action == "scroll":
+            step = int(amount)
+            if unit == "pages":
+                step *= self.visible
+            self.scroll_to(self.top + step)
+
+    def _on_configure(self, event):
+        try:
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight"))
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        visible = max(1, (event.height - self.HEADING_HEIGHT) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            if self.df is not None:
+                self.scroll_to(self.top)
 
 
 class MiniExcelVisualizer:
     
+    DEFAULT_WATCH_SECONDS = 5
+    # Appended rows are merged into the frame once they reach this fraction of it
+    WATCH_MERGE_FRACTION = 0.1
+    PERF_REFRESH_MS = 500
     
     def __init__(self, root):
         self.root = root
@@ -29,7 +376,55 @@ class MiniExcelVisualizer:
         self.canvas_widget = None
         self.fig = None
         self.current_chart_info = None  
+        self._chart_state = None
+        self.load_job = None
+        self.chart_job = None
+        self.report_job = None
+        self.dashboard_specs = []
+        # Parsed filter bar predicates, applied before every aggregation
+        self.filters = ()
+        # Live tail: rows read from the watched file wait in pending_rows
+        # until they are worth concatenating onto self.df
+        self.tail = None
+        self.watch_job = None
+        self.watch_after = None
+        self.pending_rows = []
+        # Where the tail starts: just after the last complete line the load
+        # parsed; partial_row means the frame's last row came from a line
+        # without its newline yet
+        self.tail_offset = None
+        self.partial_row = False
+        # Out-of-core mode: self.df only holds a preview and charts scan source_path
+        self.source_path = None
+        # Multi-file mode: the CSVs concatenated into self.df (source_path is None)
+        self.source_paths = None
+        self.streaming = False
+        self.stream_plan = None
+        self.total_rows = None
+        # Lazy column mode: self.df holds the preview, full columns live in
+        # this ColumnStore and are loaded the first time a chart needs them
+        self.lazy = None
+        # Column profiles ({column: profile_column(...)}), built in the
+        # background after each load; until then dtypes come from self.df
+        self.profile = {}
+        self.profile_job = None
+        # Stage timings for the Performance panel (and the log, if configured)
+        self.perf = PerfRecorder(os.environ.get(PERF_LOG_ENV))
+        self.perf_shown = None
+        self.perf_after = None
+        self.frame_cache = FrameCache()
+        self.agg_cache = AggregationCache()
+        # Bumped on every load so cached aggregates of old data never match
+        self.data_version = 0
+        # A workspace being restored: its aggregates go back in the cache and
+        # its chart is redrawn once the data is loaded
+        self.workspace_restore = None
+        self.workspace_job = None
+        self.autosave_path = os.path.join(self.frame_cache.directory, "last" + WORKSPACE_SUFFIX)
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if os.path.exists(self.autosave_path):
+            self.root.after(0, lambda: self.restore_workspace(self.autosave_path, quiet=True))
         
     def setup_ui(self):
         
@@ -54,7 +449,80 @@ class MiniExcelVisualizer:
             pady=8,
             cursor="hand2"
         )
-        btn_load.pack(side=tk.LEFT, padx=10, pady=10)
+        btn_load.pack(side=tk.LEFT, padx=(10, 0), pady=10)
+
+        # Loading a glob of files, and workspaces: the loaded data, charts and
+        # aggregates, saved and reopened
+        workspace_frame = tk.Frame(control_frame, bg="#ffffff")
+        workspace_frame.pack(side=tk.LEFT, padx=(5, 0))
+        tk.Button(
+            workspace_frame, text="🗂 Load Pattern...", command=self.load_pattern, font=("Arial", 8), cursor="hand2"
+        ).pack(side=tk.TOP, fill=tk.X, pady=1)
+        tk.Button(
+            workspace_frame, text="💾 Save Workspace", command=self.save_workspace_as, font=("Arial", 8), cursor="hand2"
+        ).pack(side=tk.TOP, fill=tk.X, pady=1)
+        tk.Button(
+            workspace_frame, text="📂 Open Workspace", command=self.open_workspace, font=("Arial", 8), cursor="hand2"
+        ).pack(side=tk.TOP, fill=tk.X, pady=1)
+
+        # Load options, stacked next to the Load button
+        load_options = tk.Frame(control_frame, bg="#ffffff")
+        load_options.pack(side=tk.LEFT, padx=(5, 10))
+
+        self.force_reparse_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            load_options,
+            text="Force reparse",
+            variable=self.force_reparse_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.TOP, anchor="w")
+
+        self.stream_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            load_options,
+            text="Stream (out-of-core)",
+            variable=self.stream_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.TOP, anchor="w")
+
+        self.lazy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            load_options,
+            text="Lazy columns",
+            variable=self.lazy_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.TOP, anchor="w")
+
+        # Multi-file loads: tag each row with the file it came from
+        self.source_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            load_options,
+            text="Add source file column",
+            variable=self.source_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.TOP, anchor="w")
+
+        # Live tail: pick up rows appended to the file every few seconds
+        watch_frame = tk.Frame(load_options, bg="#ffffff")
+        watch_frame.pack(side=tk.TOP, anchor="w")
+        self.watch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            watch_frame,
+            text="Watch file every",
+            variable=self.watch_var,
+            command=self.toggle_watch,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.LEFT)
+        self.watch_interval_var = tk.StringVar(value=str(self.DEFAULT_WATCH_SECONDS))
+        tk.Spinbox(
+            watch_frame, from_=1, to=3600, width=4, textvariable=self.watch_interval_var, font=("Arial", 9)
+        ).pack(side=tk.LEFT)
+        tk.Label(watch_frame, text="s", bg="#ffffff", font=("Arial", 9)).pack(side=tk.LEFT)
         
         # Chart controls frame
         chart_controls = tk.Frame(control_frame, bg="#ffffff")
@@ -71,6 +539,18 @@ class MiniExcelVisualizer:
         self.y_column_var = tk.StringVar()
         self.y_dropdown = ttk.Combobox(chart_controls, textvariable=self.y_column_var, state="readonly", width=15)
         self.y_dropdown.grid(row=0, column=3, padx=5)
+
+        # Date X columns can be binned in time; "auto" picks the unit from the
+        # date range. Off by default, so charts plot the raw timestamps
+        tk.Label(chart_controls, text="Resample:", bg="#ffffff", font=("Arial", 9)).grid(row=0, column=4, padx=5, sticky="w")
+        self.resample_var = tk.StringVar(value="none")
+        ttk.Combobox(
+            chart_controls,
+            textvariable=self.resample_var,
+            state="readonly",
+            width=8,
+            values=["none", "auto"] + list(RESAMPLE_UNITS)
+        ).grid(row=0, column=5, padx=5)
         
         # Aggregation
         tk.Label(chart_controls, text="Aggregation:", bg="#ffffff", font=("Arial", 9)).grid(row=1, column=0, padx=5, pady=5, sticky="w")
@@ -80,7 +560,7 @@ class MiniExcelVisualizer:
             textvariable=self.agg_var, 
             state="readonly", 
             width=15,
-            values=["sum", "mean", "count", "min", "max"]
+            values=AGG_FUNCS
         )
         self.agg_dropdown.grid(row=1, column=1, padx=5, pady=5)
         
@@ -92,9 +572,29 @@ class MiniExcelVisualizer:
             textvariable=self.chart_type_var, 
             state="readonly", 
             width=15,
-            values=["Bar", "Line", "Pie", "Scatter", "Histogram"]
+            values=CHART_TYPES
         )
         self.chart_dropdown.grid(row=1, column=3, padx=5, pady=5)
+
+        # Decimation toggle for large Line/Scatter charts
+        self.exact_data_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            chart_controls,
+            text="Exact data (no decimation)",
+            variable=self.exact_data_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).grid(row=2, column=0, columnspan=2, padx=5, sticky="w")
+
+        # Histogram statistics on big columns are sketched unless asked otherwise
+        self.exact_stats_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            chart_controls,
+            text="Exact statistics",
+            variable=self.exact_stats_var,
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).grid(row=2, column=2, columnspan=2, padx=5, sticky="w")
         
         # Chart action buttons
         btn_frame = tk.Frame(control_frame, bg="#ffffff")
@@ -139,7 +639,64 @@ class MiniExcelVisualizer:
             cursor="hand2"
         )
         btn_report.pack(side=tk.RIGHT, padx=10, pady=10)
+
+        # Dashboard: queue several charts and save them as one PDF
+        dashboard_frame = tk.Frame(control_frame, bg="#ffffff")
+        dashboard_frame.pack(side=tk.RIGHT, padx=10)
+
+        btn_add_dashboard = tk.Button(
+            dashboard_frame,
+            text="➕ Add to Dashboard",
+            command=self.add_to_dashboard,
+            bg="#607D8B",
+            fg="white",
+            font=("Arial", 9, "bold"),
+            padx=10,
+            pady=4,
+            cursor="hand2"
+        )
+        btn_add_dashboard.pack(side=tk.TOP, fill=tk.X, pady=2)
+
+        btn_dashboard = tk.Button(
+            dashboard_frame,
+            text="📑 Dashboard PDF",
+            command=self.generate_dashboard_report,
+            bg="#673AB7",
+            fg="white",
+            font=("Arial", 9, "bold"),
+            padx=10,
+            pady=4,
+            cursor="hand2"
+        )
+        btn_dashboard.pack(side=tk.TOP, fill=tk.X, pady=2)
+
+        dashboard_status = tk.Frame(dashboard_frame, bg="#ffffff")
+        dashboard_status.pack(side=tk.TOP, fill=tk.X)
+        self.dashboard_label = tk.Label(dashboard_status, text="Dashboard: 0 charts", bg="#ffffff", font=("Arial", 8))
+        self.dashboard_label.pack(side=tk.LEFT)
+        tk.Button(
+            dashboard_status, text="Clear", command=self.clear_dashboard, font=("Arial", 8), cursor="hand2"
+        ).pack(side=tk.RIGHT)
         
+        # Filter bar: predicates applied to the rows before any aggregation
+        filter_frame = tk.Frame(main_frame, bg="#ffffff", relief=tk.RIDGE, bd=1)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+
+        tk.Label(filter_frame, text="Filter:", bg="#ffffff", font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=(10, 5), pady=5)
+        self.filter_var = tk.StringVar()
+        filter_entry = tk.Entry(filter_frame, textvariable=self.filter_var, width=60, font=("Arial", 9))
+        filter_entry.pack(side=tk.LEFT, pady=5)
+        filter_entry.bind("<Return>", lambda event: self.apply_filter())
+        tk.Button(filter_frame, text="Apply", command=self.apply_filter, font=("Arial", 9), cursor="hand2").pack(side=tk.LEFT, padx=5)
+        tk.Button(filter_frame, text="Clear", command=self.clear_filter, font=("Arial", 9), cursor="hand2").pack(side=tk.LEFT)
+        tk.Label(
+            filter_frame,
+            text="e.g.  region == North; amount > 100; date last 30 days; top 5 region by amount",
+            bg="#ffffff",
+            fg="#777777",
+            font=("Arial", 8)
+        ).pack(side=tk.LEFT, padx=10)
+
         # Content area (data table + chart) using PanedWindow for fixed split
         content_paned = tk.PanedWindow(main_frame, orient=tk.HORIZONTAL, bg="#f5f7fa", sashwidth=5, sashrelief=tk.RAISED)
         content_paned.pack(fill=tk.BOTH, expand=True)
@@ -148,28 +705,26 @@ class MiniExcelVisualizer:
         table_frame = tk.Frame(content_paned, bg="#ffffff", relief=tk.RIDGE, bd=1, width=600)
         content_paned.add(table_frame, minsize=400)
         
-        tk.Label(table_frame, text="Data Table", bg="#ffffff", font=("Arial", 11, "bold")).pack(pady=5)
-        
-        # Treeview with scrollbars
+        table_header = tk.Frame(table_frame, bg="#ffffff")
+        table_header.pack(fill=tk.X, pady=5)
+
+        tk.Label(table_header, text="Data Table", bg="#ffffff", font=("Arial", 11, "bold")).pack(side=tk.LEFT, padx=5)
+
+        # Jump-to-row controls
+        btn_goto = tk.Button(table_header, text="Go", command=self.jump_to_row, font=("Arial", 9), cursor="hand2")
+        btn_goto.pack(side=tk.RIGHT, padx=5)
+        self.goto_row_var = tk.StringVar()
+        goto_entry = tk.Entry(table_header, textvariable=self.goto_row_var, width=10)
+        goto_entry.pack(side=tk.RIGHT)
+        goto_entry.bind("<Return>", lambda event: self.jump_to_row())
+        tk.Label(table_header, text="Row:", bg="#ffffff", font=("Arial", 9)).pack(side=tk.RIGHT, padx=5)
+
+        # Virtual Treeview with scrollbars
         tree_container = tk.Frame(table_frame, bg="#ffffff")
         tree_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        tree_scroll_y = ttk.Scrollbar(tree_container, orient=tk.VERTICAL)
-        tree_scroll_x = ttk.Scrollbar(tree_container, orient=tk.HORIZONTAL)
-        
-        self.tree = ttk.Treeview(
-            tree_container,
-            yscrollcommand=tree_scroll_y.set,
-            xscrollcommand=tree_scroll_x.set,
-            show="tree headings"
-        )
-        
-        tree_scroll_y.config(command=self.tree.yview)
-        tree_scroll_x.config(command=self.tree.xview)
-        
-        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.table = VirtualTable(tree_container)
+        self.tree = self.table.tree
         
         # Right panel - Chart area
         self.chart_frame = tk.Frame(content_paned, bg="#ffffff", relief=tk.RIDGE, bd=1, width=600)
@@ -188,71 +743,745 @@ class MiniExcelVisualizer:
         )
         self.chart_placeholder.pack(expand=True)
         
-        # Status bar
+        # Status bar with progress indicator for background jobs
+        self.status_frame = status_frame = tk.Frame(self.root, bd=1, relief=tk.SUNKEN, bg="#e0e0e0")
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, before=main_frame)
+
         self.status_bar = tk.Label(
-            self.root, 
+            status_frame, 
             text="Ready", 
-            bd=1, 
-            relief=tk.SUNKEN, 
             anchor=tk.W,
             bg="#e0e0e0",
             font=("Arial", 9)
         )
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-        
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.btn_cancel = tk.Button(
+            status_frame,
+            text="Cancel",
+            font=("Arial", 8),
+            padx=6,
+            pady=0,
+            cursor="hand2"
+        )
+        self.progress_bar = ttk.Progressbar(status_frame, orient=tk.HORIZONTAL, length=200, mode="determinate", maximum=1.0)
+
+        self.btn_perf = tk.Button(
+            status_frame,
+            text="⏱ Performance ▴",
+            command=self.toggle_perf_panel,
+            bg="#e0e0e0",
+            font=("Arial", 8),
+            relief=tk.FLAT,
+            padx=6,
+            pady=0,
+            cursor="hand2"
+        )
+        self.btn_perf.pack(side=tk.RIGHT, padx=5)
+
+        # Performance panel: timings of the latest pipeline stages, shown
+        # above the status bar on demand
+        self.perf_panel = tk.Frame(self.root, bg="#ffffff", relief=tk.RIDGE, bd=1)
+        perf_controls = tk.Frame(self.perf_panel, bg="#ffffff")
+        perf_controls.pack(side=tk.TOP, fill=tk.X)
+        tk.Label(perf_controls, text="Performance", bg="#ffffff", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+
+        self.perf_memory_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            perf_controls,
+            text="Peak memory (slower)",
+            variable=self.perf_memory_var,
+            command=lambda: self.perf.set_trace_memory(self.perf_memory_var.get()),
+            bg="#ffffff",
+            font=("Arial", 9)
+        ).pack(side=tk.LEFT, padx=10)
+
+        log_text = f"Log: {self.perf.log_path}" if self.perf.log_path else f"Set {PERF_LOG_ENV} to log to a file"
+        tk.Label(perf_controls, text=log_text, bg="#ffffff", fg="#666666", font=("Arial", 8)).pack(side=tk.LEFT)
+        tk.Button(
+            perf_controls, text="Clear", command=self.perf.clear, font=("Arial", 8), cursor="hand2"
+        ).pack(side=tk.RIGHT, padx=5, pady=2)
+
+        perf_columns = {
+            "stage": ("Stage", 110, tk.W),
+            "wall": ("Wall (ms)", 80, tk.E),
+            "cpu": ("CPU (ms)", 80, tk.E),
+            "memory": ("Peak memory", 90, tk.E),
+            "rows": ("Rows", 90, tk.E),
+            "details": ("Details", 500, tk.W),
+        }
+        self.perf_tree = ttk.Treeview(self.perf_panel, columns=list(perf_columns), show="headings", height=8)
+        for col, (heading, width, anchor) in perf_columns.items():
+            self.perf_tree.heading(col, text=heading)
+            self.perf_tree.column(col, width=width, anchor=anchor, stretch=(col == "details"))
+        self.perf_tree.pack(fill=tk.X, padx=5, pady=(0, 5))
+
     def load_csv(self):
-        """Load a CSV file and display in table"""
+        """Ask for one or more CSV files and load them on a background thread"""
+        paths = filedialog.askopenfilenames(
+            title="Select CSV File(s)",
+            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+        )
+        
+        if not paths:
+            return
+        if len(paths) == 1:
+            self.open_file(paths[0])
+        else:
+            self.open_files(list(paths))
+
+    def load_pattern(self):
+        """Ask for a glob pattern, e.g. data/2024-*.csv, and load the matching files as one dataset"""
+        pattern = simpledialog.askstring("Load Pattern", "Files to load (glob pattern, e.g. logs/*.csv):", parent=self.root)
+        if not pattern:
+            return
         try:
-            filepath = filedialog.askopenfilename(
-                title="Select CSV File",
-                filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+            paths = expand_sources([pattern.strip()])
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            self.set_status("No files loaded")
+            return
+        self.open_files(paths)
+
+    def open_file(self, filepath, restore=None):
+        """Load filepath on a background thread, as the load options say
+
+        restore, when reopening a workspace, is {'aggregates': [...], 'redraw':
+        bool}: aggregates to put back into the cache once the data is in, and
+        whether to redraw the chart from the controls then.
+        """
+        # Only one load at a time - a new choice aborts the previous one
+        if self.load_job is not None and not self.load_job.finished:
+            self.load_job.cancel()
+        self.workspace_restore = restore
+        if self.profile_job is not None and not self.profile_job.finished:
+            self.profile_job.cancel()
+
+        filename = os.path.basename(filepath)
+        force_reparse = self.force_reparse_var.get()
+        if self.stream_var.get() or should_stream(filepath):
+            # Too big for memory: only read a preview, charts stream the file
+            job = BackgroundJob(self.root, target=lambda job: load_preview(filepath, perf=self.perf))
+            job.on_done = lambda result: self._on_load_done(job, filepath, result[0], False, stream_plan=result[1])
+        elif self.lazy_var.get():
+            # Wide files: read the header and a sample now, columns when charted
+            job = BackgroundJob(
+                self.root, target=lambda job: ColumnStore(filepath, cache=self.frame_cache, perf=self.perf)
             )
-            
-            if not filepath:
-                return
-            
-            self.df = pd.read_csv(filepath)
-            self.filename = os.path.basename(filepath)
+            job.on_done = lambda store: self._on_load_done(job, filepath, store.preview, False, lazy=store)
+        else:
+            job = BackgroundJob(
+                self.root,
+                target=lambda job: load_dataset_snapshot(
+                    filepath,
+                    cache=self.frame_cache,
+                    force_reparse=force_reparse,
+                    progress=job.report,
+                    cancel_event=job.cancel_event,
+                    perf=self.perf
+                )
+            )
+            job.on_done = lambda result: self._on_load_done(
+                job, filepath, result[0], result[1], extent=result[2:]
+            )
+        job.on_progress = lambda fraction, message: self._on_load_progress(job, fraction, message)
+        job.on_error = lambda e: self._on_load_error(job, e)
+        job.on_cancel = lambda: self._on_load_cancelled(job, filename)
+
+        self.load_job = job
+        self.show_progress(lambda: self._on_load_cancelled(job, filename))
+        self.set_status(f"Loading: {filename}...")
+        job.start()
+
+    def open_files(self, paths, restore=None):
+        """Load several CSVs as one dataset, parsed in parallel on a background thread
+
+        Multi-file datasets are always held in memory; the stream and lazy
+        options only apply to single files. restore is as for open_file().
+        """
+        if self.load_job is not None and not self.load_job.finished:
+            self.load_job.cancel()
+        self.workspace_restore = restore
+        if self.profile_job is not None and not self.profile_job.finished:
+            self.profile_job.cancel()
+
+        filename = describe_sources(paths)
+        force_reparse = self.force_reparse_var.get()
+        source_column = SOURCE_COLUMN if self.source_var.get() else None
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: load_sources(
+                paths,
+                cache=self.frame_cache,
+                force_reparse=force_reparse,
+                source_column=source_column,
+                progress=job.report,
+                cancel_event=job.cancel_event,
+                perf=self.perf
+            )
+        )
+        job.on_done = lambda result: self._on_load_done(job, None, *result, sources=paths)
+        job.on_progress = lambda fraction, message: self._on_load_progress(job, fraction, message)
+        job.on_error = lambda e: self._on_load_error(job, e)
+        job.on_cancel = lambda: self._on_load_cancelled(job, filename)
+
+        self.load_job = job
+        self.show_progress(lambda: self._on_load_cancelled(job, filename))
+        self.set_status(f"Loading {len(paths)} files: {filename}...")
+        job.start()
+
+    def _on_load_progress(self, job, fraction, message):
+        if job is not self.load_job:
+            return
+        self.update_progress(fraction)
+        self.set_status(message)
+
+    def _on_load_done(self, job, filepath, df, from_cache, stream_plan=None, lazy=None, sources=None, extent=None):
+        if job is not self.load_job:
+            return
+        self.load_job = None
+        self.hide_progress()
+        try:
+            self.stop_watch(flush=False)
+            self.df = df
+            self.source_paths = sources
+            if sources is not None:
+                self.filename = describe_sources(sources)
+                self.source_path = None
+            else:
+                self.filename = os.path.basename(filepath)
+                self.source_path = filepath
+            # extent is (offset, size) of a full in-memory load, see load_dataset_snapshot
+            self.tail_offset = extent[0] if extent is not None else None
+            self.partial_row = extent is not None and extent[0] < extent[1] and len(df) > 0
+            self.streaming = stream_plan is not None
+            self.stream_plan = stream_plan
+            self.lazy = lazy
+            self.total_rows = None if self.streaming or lazy is not None else len(df)
+            self.data_version += 1
+            self.agg_cache.clear()
+            self.profile = {}
+            restore, self.workspace_restore = self.workspace_restore, None
+            if restore is not None:
+                restore_aggregates(self.agg_cache, self.data_version, restore['aggregates'])
             
             self.display_data()
             self.update_column_dropdowns()
-            self.set_status(f"Loaded: {self.filename} ({len(self.df)} rows, {len(self.df.columns)} columns)")
+            if not self.streaming and self.lazy is None:
+                self.start_profile(self.df)
+            if self.streaming:
+                self.set_status(
+                    f"Streaming: {self.filename} (showing the first {len(self.df)} rows; charts scan the whole file)"
+                )
+            elif self.lazy is not None:
+                self.set_status(
+                    f"Opened: {self.filename} ({len(self.df.columns)} columns, showing the first {len(self.df)} rows; "
+                    f"columns load when first charted)"
+                )
+            elif sources is not None:
+                self.set_status(
+                    f"Loaded {len(sources)} files ({from_cache} from cache): {self.filename} "
+                    f"({len(self.df)} rows, {len(self.df.columns)} columns) | {memory_report(self.df)}"
+                )
+            else:
+                source = " from cache" if from_cache else ""
+                self.set_status(
+                    f"Loaded{source}: {self.filename} ({len(self.df)} rows, {len(self.df.columns)} columns) | {memory_report(self.df)}"
+                )
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load CSV:\n{str(e)}")
             self.set_status("Error loading file")
+            return
+        if restore is not None and restore['redraw']:
+            # Redraw the workspace's chart from the data; its aggregates are cached if they are still valid
+            self.generate_chart()
+
+    def _on_load_error(self, job, error):
+        if job is not self.load_job:
+            return
+        self.load_job = None
+        self.hide_progress()
+        messagebox.showerror("Error", f"Failed to load CSV:\n{str(error)}")
+        self.set_status("Error loading file")
+
+    def _on_load_cancelled(self, job, filename):
+        # Called both by the Cancel button and when the worker acknowledges
+        # the cancellation; the worker stops at the next chunk boundary
+        if job is not self.load_job:
+            return
+        job.cancel()
+        self.load_job = None
+        self.hide_progress()
+        self.set_status(f"Loading cancelled: {filename}")
+
+    def ensure_columns(self, columns, then):
+        """True if columns are in memory; in lazy mode otherwise load them and call then() after"""
+        if self.lazy is None:
+            return True
+        missing = self.lazy.missing(columns)
+        if not missing:
+            return True
+        if self.load_job is not None and not self.load_job.finished:
+            messagebox.showwarning("Warning", "Please wait for the current load to finish")
+            return False
+
+        lazy = self.lazy
+        filename = self.filename
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: lazy.read(missing, progress=job.report, cancel_event=job.cancel_event)
+        )
+        job.on_progress = lambda fraction, message: self._on_load_progress(job, fraction, message)
+        job.on_done = lambda result: self._on_columns_loaded(job, *result, then)
+        job.on_error = lambda e: self._on_load_error(job, e)
+        job.on_cancel = lambda: self._on_load_cancelled(job, filename)
+
+        self.load_job = job
+        self.show_progress(lambda: self._on_load_cancelled(job, filename))
+        self.set_status(f"Loading {', '.join(missing)} from {filename}...")
+        job.start()
+        return False
+
+    def _on_columns_loaded(self, job, frame, from_cache, then):
+        if job is not self.load_job:
+            return
+        self.load_job = None
+        self.hide_progress()
+        try:
+            self.lazy.add(frame)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load columns:\n{str(e)}")
+            self.set_status("Error loading columns")
+            return
+        self.total_rows = self.lazy.rows
+        source = " from cache" if from_cache else ""
+        self.set_status(
+            f"Loaded{source}: {', '.join(frame.columns)} ({self.total_rows:,} rows) | {memory_report(self.lazy.loaded)}"
+        )
+        self.start_profile(frame)
+        then()
+
+    def start_profile(self, df):
+        """Profile df's columns on a worker thread (or read their saved profiles)"""
+        if self.profile_job is not None and not self.profile_job.finished:
+            # Lazy mode loads columns one batch at a time; profile them together
+            self.profile_job.cancel()
+            profiled = set(self.profile)
+            df = self.data_frame([col for col in self.lazy.loaded.columns if col not in profiled]) \
+                if self.lazy is not None else df
+        filepath = self.source_path
+        version = self.data_version
+        rows = len(df)
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: dataset_profile(
+                df, filepath=filepath, cache=self.frame_cache, cancel_event=job.cancel_event, perf=self.perf
+            )
+        )
+        job.on_done = lambda profiles: self._on_profile_done(job, version, rows, profiles)
+        job.on_error = lambda e: self._on_profile_error(job, e)
+        self.profile_job = job
+        job.start()
+
+    def _on_profile_done(self, job, version, rows, profiles):
+        if job is not self.profile_job:
+            return
+        self.profile_job = None
+        if version != self.data_version:
+            return
+        self.profile.update(profiles)
+        # Rows appended by the watcher since the profile started make its statistics stale
+        if rows == self.total_rows and not self.pending_rows:
+            seed_profile_summaries(self.agg_cache, self.data_version, profiles)
+        self.update_column_dropdowns()
+
+    def _on_profile_error(self, job, error):
+        # Profiles only speed things up; charts and reports work without them
+        if job is not self.profile_job:
+            return
+        self.profile_job = None
+        self.set_status(f"Column profiling failed: {error}")
+
+    def data_frame(self, columns):
+        """The frame charts read: the loaded data, or in lazy mode its loaded columns"""
+        if self.lazy is None:
+            return self.df
+        return self.lazy.frame(columns)
+
+    def workspace_state(self):
+        """The GUI state a workspace keeps: load options, chart controls and dashboard"""
+        return {
+            'stream': self.stream_var.get(),
+            'lazy': self.lazy_var.get(),
+            'source_column': self.source_var.get(),
+            'controls': {
+                'x_col': self.x_column_var.get(),
+                'y_col': self.y_column_var.get(),
+                'agg_func': self.agg_var.get(),
+                'chart_type': self.chart_type_var.get(),
+                'resample': self.resample_var.get(),
+                'exact_data': self.exact_data_var.get(),
+                'exact_stats': self.exact_stats_var.get(),
+            },
+            'dashboard': self.dashboard_specs,
+        }
+
+    def write_workspace(self, path):
+        """Save the session to path (see engine.save_workspace)"""
+        self.flush_appended_rows()
+        save_workspace(
+            path, self.source_paths or self.source_path, self.workspace_state(), filters=self.filters,
+            chart=self.current_chart_info, cache=self.agg_cache, version=self.data_version
+        )
+
+    def save_workspace_as(self):
+        """Ask for a file name and save the workspace to it"""
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load a CSV file first")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Save Workspace",
+            defaultextension=WORKSPACE_SUFFIX,
+            filetypes=[("Workspaces", f"*{WORKSPACE_SUFFIX}")]
+        )
+        if not path:
+            return
+        try:
+            self.write_workspace(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save workspace:\n{str(e)}")
+            self.set_status("Saving the workspace failed")
+            return
+        self.set_status(f"Workspace saved: {os.path.basename(path)}")
+
+    def open_workspace(self):
+        """Ask for a workspace file and restore it"""
+        path = filedialog.askopenfilename(
+            title="Open Workspace",
+            filetypes=[("Workspaces", f"*{WORKSPACE_SUFFIX}"), ("All Files", "*.*")]
+        )
+        if path:
+            self.restore_workspace(path)
+
+    def restore_workspace(self, path, quiet=False):
+        """Read a workspace on a worker thread, then show its chart and reload its data
+
+        quiet (used for the workspace saved on exit) skips error dialogs.
+        """
+        job = BackgroundJob(self.root, target=lambda job: load_workspace(path))
+        job.on_done = lambda workspace: self._on_workspace_loaded(job, path, workspace, quiet)
+        job.on_error = lambda e: self._on_workspace_error(job, e, quiet)
+        self.workspace_job = job
+        self.set_status(f"Opening workspace: {os.path.basename(path)}...")
+        job.start()
+
+    def _on_workspace_loaded(self, job, path, workspace, quiet):
+        if job is not self.workspace_job:
+            return
+        self.workspace_job = None
+        state = workspace['state']
+        source = workspace['source']
+        try:
+            controls = state['controls']
+            self.x_column_var.set(controls['x_col'])
+            self.y_column_var.set(controls['y_col'])
+            self.agg_var.set(controls['agg_func'])
+            self.chart_type_var.set(controls['chart_type'])
+            self.resample_var.set(controls['resample'])
+            self.exact_data_var.set(controls['exact_data'])
+            self.exact_stats_var.set(controls['exact_stats'])
+            self.stream_var.set(state['stream'])
+            self.lazy_var.set(state['lazy'])
+            self.source_var.set(state.get('source_column', False))
+            self.filters = workspace['filters']
+            self.filter_var.set(format_filters(self.filters))
+            self.dashboard_specs = list(state['dashboard'])
+            self.update_dashboard_label()
+        except Exception as e:
+            self._on_workspace_error(None, e, False)
+            return
+        multiple = isinstance(source, list)
+        missing = [filepath for filepath in (source if multiple else [source]) if not os.path.exists(filepath)]
+        if missing:
+            if not quiet:
+                messagebox.showwarning("Warning", "The workspace's data file is missing:\n" + "\n".join(missing))
+            self.set_status(f"Workspace opened without data: {os.path.basename(path)}")
+            return
+
+        self.filename = describe_sources(source) if multiple else os.path.basename(source)
+        if workspace['current'] and workspace['chart'] is not None:
+            # The file has not changed, so the saved chart is still right: show it now
+            chart = workspace['chart']
+            self._show_chart(chart_spec(chart), chart)
+        restore = {
+            'aggregates': workspace['aggregates'] if workspace['current'] else [],
+            'redraw': workspace['chart'] is not None,
+        }
+        if multiple:
+            self.open_files(source, restore=restore)
+        else:
+            self.source_path = source
+            self.open_file(source, restore=restore)
+        if workspace['current']:
+            self.set_status(f"Restored workspace {os.path.basename(path)}; loading {self.filename} in the background...")
+        else:
+            self.set_status(f"{self.filename} changed since the workspace was saved; loading it again...")
+
+    def _on_workspace_error(self, job, error, quiet):
+        if job is not self.workspace_job and job is not None:
+            return
+        self.workspace_job = None
+        if not quiet:
+            messagebox.showerror("Error", f"Failed to open workspace:\n{str(error)}")
+        self.set_status("Opening the workspace failed")
+
+    def on_close(self):
+        """Save the session for the next start, then quit"""
+        if (self.source_path is not None or self.source_paths) and self.df is not None:
+            try:
+                os.makedirs(os.path.dirname(self.autosave_path), exist_ok=True)
+                self.write_workspace(self.autosave_path)
+            except Exception:
+                # Never keep the window from closing
+                pass
+        self.root.destroy()
+
+    def show_progress(self, cancel_command):
+        """Show the progress bar and Cancel button in the status bar"""
+        self.progress_bar["value"] = 0
+        self.btn_cancel.config(command=cancel_command)
+        self.btn_cancel.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5, pady=2)
+
+    def update_progress(self, fraction):
+        self.progress_bar["value"] = fraction
+
+    def hide_progress(self):
+        self.progress_bar.pack_forget()
+        self.btn_cancel.pack_forget()
     
     def display_data(self):
-        """Display DataFrame in Treeview"""
-        # Clear existing data
-        self.tree.delete(*self.tree.get_children())
-        
-        # Configure columns
-        self.tree["columns"] = list(self.df.columns)
-        self.tree["show"] = "headings"
-        
-        # Set column headings
-        for col in self.df.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, anchor=tk.W)
-        
-        # Insert data rows
-        for idx, row in self.df.iterrows():
-            self.tree.insert("", tk.END, values=list(row))
-    
+        """Display DataFrame in the virtual Treeview"""
+        with self.perf.stage("table", rows=len(self.df)):
+            self.table.set_frame(self.df)
+
+    def jump_to_row(self):
+        """Scroll the data table to the row number typed in the Row box"""
+        if self.df is None:
+            return
+        try:
+            row = int(self.goto_row_var.get())
+        except ValueError:
+            messagebox.showwarning("Warning", "Please enter a row number")
+            return
+        self.table.jump_to(row - 1)
+        self.set_status(f"Row {min(max(row, 1), len(self.df))} of {len(self.df)}")
+
+    def toggle_watch(self):
+        """Start or stop following the loaded file for appended rows"""
+        if self.watch_var.get():
+            self.start_watch()
+        else:
+            self.stop_watch()
+            self.set_status(f"Stopped watching {self.filename}")
+
+    def start_watch(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load a CSV file first")
+            self.watch_var.set(False)
+            return
+        if self.streaming or self.lazy is not None:
+            # Streamed charts rescan the file, so their cached aggregates
+            # cannot tell which appended rows they already include; lazily
+            # loaded columns would each need their own tail
+            messagebox.showwarning("Warning", "Watching needs the whole file loaded in memory")
+            self.watch_var.set(False)
+            return
+        if self.source_paths is not None:
+            messagebox.showwarning("Warning", "Watching follows a single file; reload the files to pick up changes")
+            self.watch_var.set(False)
+            return
+
+        try:
+            # Parse new rows the way the loaded frame was typed
+            plan = {}
+            for col, (kind, fmt) in infer_column_plan(self.source_path).items():
+                if col not in self.df.columns:
+                    continue
+                dtype = self.df[col].dtype
+                if (kind == "category" and isinstance(dtype, pd.CategoricalDtype)) or \
+                        (kind == "datetime" and pd.api.types.is_datetime64_any_dtype(dtype)):
+                    plan[col] = (kind, fmt)
+            self.tail = FileTail(self.source_path, plan=plan, offset=self.tail_offset)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to watch file:\n{str(e)}")
+            self.watch_var.set(False)
+            return
+        self.pending_rows = []
+        if self.partial_row:
+            # The last line had no newline when it was loaded, so its row may
+            # be cut short; the tail reads the line again once it is complete
+            self.partial_row = False
+            self.df = self.df.iloc[:-1]
+            self.total_rows = len(self.df)
+            self.data_version += 1
+            self.agg_cache.clear()
+            self.profile = {}
+            self.display_data()
+            self.start_profile(self.df)
+            if self.current_chart_info is not None:
+                self.refresh_chart()
+        self.set_status(f"Watching {self.filename} for new rows")
+        self._schedule_watch()
+
+    def stop_watch(self, flush=True):
+        self.tail = None
+        if self.watch_after is not None:
+            self.root.after_cancel(self.watch_after)
+            self.watch_after = None
+        if self.watch_job is not None:
+            self.watch_job.cancel()
+            self.watch_job = None
+        if flush:
+            self.flush_appended_rows()
+        else:
+            self.pending_rows = []
+
+    def _schedule_watch(self):
+        try:
+            seconds = max(1, int(self.watch_interval_var.get()))
+        except ValueError:
+            seconds = self.DEFAULT_WATCH_SECONDS
+        self.watch_after = self.root.after(seconds * 1000, self._poll_watched_file)
+
+    def _poll_watched_file(self):
+        self.watch_after = None
+        if self.tail is None:
+            return
+        tail = self.tail
+        job = BackgroundJob(self.root, target=lambda job: tail.read_new())
+        job.on_done = lambda rows: self._on_appended_rows(job, rows)
+        job.on_error = lambda e: self._on_watch_error(job, e)
+        self.watch_job = job
+        job.start()
+
+    def _on_appended_rows(self, job, rows):
+        if job is not self.watch_job:
+            return
+        self.watch_job = None
+        if len(rows):
+            try:
+                # Cached aggregates absorb the new rows; the frame itself only
+                # grows once enough rows are pending to make the copy worth it
+                extend_aggregates(self.agg_cache, self.data_version, rows)
+                self.pending_rows.append(rows)
+                self.total_rows += len(rows)
+                if sum(len(chunk) for chunk in self.pending_rows) >= len(self.df) * self.WATCH_MERGE_FRACTION:
+                    self.flush_appended_rows()
+                if self.current_chart_info is not None:
+                    self.refresh_chart()
+            except Exception as e:
+                self._on_watch_error(None, e)
+                return
+            self.set_status(f"Watching {self.filename}: +{len(rows):,} rows, {self.total_rows:,} in total")
+        self._schedule_watch()
+
+    def _on_watch_error(self, job, error):
+        if job is not self.watch_job:
+            return
+        self.watch_job = None
+        self.watch_var.set(False)
+        self.stop_watch()
+        if isinstance(error, FileReplaced):
+            messagebox.showwarning("Warning", f"{error}. Load it again to continue.")
+        else:
+            messagebox.showerror("Error", f"Failed to read new rows:\n{str(error)}")
+        self.set_status(f"Stopped watching {self.filename}")
+
+    def flush_appended_rows(self):
+        """Concatenate rows picked up by the watcher onto the loaded frame"""
+        if not self.pending_rows:
+            return
+        plan = self.tail.plan if self.tail is not None else {}
+        self.df = concat_chunks([self.df] + self.pending_rows, plan)
+        self.pending_rows = []
+        self.table.extend_frame(self.df)
+
+    def refresh_chart(self):
+        """Redraw the current chart from the updated aggregates, in place when possible"""
+        info = self.current_chart_info
+        spec = chart_spec(info)
+        if self.filters or spec['chart_type'] == "Histogram" or \
+                self.agg_cache.get((self.data_version, group_key(spec['x_col'], spec['resample']), spec['y_col'])) is None:
+            # Not covered by the incrementally updated aggregates: recompute from the full frame
+            self.flush_appended_rows()
+        result = {'data': prepare_chart_data(
+            self.df, spec, cache=self.agg_cache, version=self.data_version, filters=self.filters
+        )}
+        self._show_chart(spec, result)
+
+    def apply_filter(self):
+        """Parse the filter bar and redraw the current chart with it"""
+        try:
+            filters = parse_filters(self.filter_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid filter:\n{str(e)}")
+            return
+        if self.df is None:
+            self.filters = filters
+            return
+        if not self.ensure_columns(filter_columns(filters), self.apply_filter):
+            return
+        self.filters = filters
+
+        if filters and not self.streaming:
+            try:
+                self.flush_appended_rows()
+                df = self.data_frame(filter_columns(filters))
+                with self.perf.stage("filter", rows=len(df), filters=format_filters(filters)):
+                    mask = filter_mask(df, filters, cache=self.agg_cache, version=self.data_version)
+            except Exception as e:
+                messagebox.showerror("Error", f"Invalid filter:\n{str(e)}")
+                self.filters = ()
+                return
+            message = f"Filter: {int(mask.sum()):,} of {len(df):,} rows match"
+        elif filters:
+            message = "Filter set; it is applied while charts scan the file"
+        else:
+            message = "Filter cleared"
+
+        if self.current_chart_info is not None:
+            self.generate_chart()
+        if not (self.streaming and self.chart_job is not None):
+            self.set_status(message)
+
+    def clear_filter(self):
+        """Remove all filters"""
+        self.filter_var.set("")
+        self.apply_filter()
+
+    def is_numeric_column(self, col):
+        """Whether col holds numbers, by its profile or else the dtype of the loaded data"""
+        if col in self.profile:
+            return self.profile[col]['numeric']
+        return col in self.df.columns and pd.api.types.is_numeric_dtype(self.df[col])
+
     def update_column_dropdowns(self):
-        """Update X and Y column dropdowns with DataFrame columns"""
+        """Update X and Y column dropdowns: every column for X, numeric ones for Y"""
         if self.df is not None:
             columns = list(self.df.columns)
+            # Without any numeric column, Y stays open to every column for count charts
+            y_columns = [col for col in columns if self.is_numeric_column(col)] or columns
             self.x_dropdown["values"] = columns
-            self.y_dropdown["values"] = columns
-            
-            if len(columns) > 0:
+            self.y_dropdown["values"] = y_columns
+
+            # Keep choices that are still offered (the profile refreshes the lists after a load)
+            if self.x_column_var.get() not in columns and len(columns) > 0:
                 self.x_dropdown.current(0)
-            if len(columns) > 1:
-                self.y_dropdown.current(1)
-            elif len(columns) > 0:
-                self.y_dropdown.current(0)
+            if self.y_column_var.get() not in y_columns and len(y_columns) > 0:
+                y_default = [col for col in y_columns if col != self.x_column_var.get()] or y_columns
+                self.y_dropdown.current(y_columns.index(y_default[0]))
     
     def generate_chart(self):
         """Generate chart based on selected parameters"""
@@ -260,97 +1489,225 @@ class MiniExcelVisualizer:
             messagebox.showwarning("Warning", "Please load a CSV file first")
             return
         
-        x_col = self.x_column_var.get()
-        y_col = self.y_column_var.get()
-        agg_func = self.agg_var.get()
-        chart_type = self.chart_type_var.get()
-        
-        if not x_col or not y_col:
-            messagebox.showwarning("Warning", "Please select both X and Y columns")
+        spec = self.selected_chart_spec()
+        if spec is None:
             return
-        
+        if self.streaming:
+            self._start_streamed_chart(spec)
+            return
+        columns = chart_columns([spec], self.filters)
+        if not self.ensure_columns(columns, self.generate_chart):
+            return
+
+        try:
+            self.flush_appended_rows()
+            df = self.data_frame(columns)
+            with self.perf.stage("aggregate", rows=len(df), chart=chart_title(spec)):
+                result = {'data': prepare_chart_data(
+                    df, spec, cache=self.agg_cache, version=self.data_version, filters=self.filters
+                )}
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to generate chart:\n{str(e)}")
+            self.set_status("Chart generation failed")
+            return
+        self._show_chart(spec, result)
+
+    def _start_streamed_chart(self, spec):
+        """Compute a chart's data by scanning the source file on a worker thread"""
+        if self.chart_job is not None and not self.chart_job.finished:
+            self.chart_job.cancel()
+
+        filepath = self.source_path
+        filters = self.filters
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: stream_chart_data(
+                filepath, spec,
+                plan=self.stream_plan,
+                cache=self.agg_cache,
+                version=self.data_version,
+                progress=job.report,
+                cancel_event=job.cancel_event,
+                filters=filters,
+                perf=self.perf
+            )
+        )
+        job.on_progress = lambda bytes_read, total, rows: self._on_chart_progress(job, bytes_read, total, rows)
+        job.on_done = lambda result: self._on_chart_done(job, spec, result)
+        job.on_error = lambda e: self._on_chart_error(job, e)
+        job.on_cancel = lambda: self._on_chart_cancelled(job)
+
+        self.chart_job = job
+        self.show_progress(lambda: self._on_chart_cancelled(job))
+        self.set_status(f"Scanning: {self.filename}...")
+        job.start()
+
+    def _on_chart_progress(self, job, bytes_read, total, rows):
+        if job is not self.chart_job:
+            return
+        self.update_progress(bytes_read / total if total else 1.0)
+        self.set_status(f"Scanning: {self.filename} - {format_bytes(bytes_read)} of {format_bytes(total)}, {rows:,} rows")
+
+    def _on_chart_done(self, job, spec, result):
+        if job is not self.chart_job:
+            return
+        self.chart_job = None
+        self.hide_progress()
+        if result['rows'] is not None:
+            self.total_rows = result['rows']
+        self._show_chart(spec, result)
+
+    def _on_chart_error(self, job, error):
+        if job is not self.chart_job:
+            return
+        self.chart_job = None
+        self.hide_progress()
+        messagebox.showerror("Error", f"Failed to generate chart:\n{str(error)}")
+        self.set_status("Chart generation failed")
+
+    def _on_chart_cancelled(self, job):
+        if job is not self.chart_job:
+            return
+        job.cancel()
+        self.chart_job = None
+        self.hide_progress()
+        self.set_status("Chart cancelled")
+
+    def _show_chart(self, spec, result):
+        """Draw computed chart data and remember it for the report
+
+        result holds 'data' and, for streamed histograms, the precomputed
+        'histogram' bins and 'summary' statistics.
+        """
+        x_col = spec['x_col']
+        y_col = spec['y_col']
+        agg_func = spec['agg_func']
+        chart_type = spec['chart_type']
+        data = result['data']
+
         try:
-            # Clear previous chart
-            self.clear_chart()
-            
             # Remove placeholder if it exists
             if hasattr(self, 'chart_placeholder') and self.chart_placeholder.winfo_exists():
                 self.chart_placeholder.pack_forget()
-            
-            # Create figure
-            self.fig = Figure(figsize=(6, 5), dpi=100)
-            ax = self.fig.add_subplot(111)
-            
-            # Prepare data with aggregation
-            if chart_type == "Histogram":
-                # Histogram only needs Y column
-                if not pd.api.types.is_numeric_dtype(self.df[y_col]):
-                    raise ValueError(f"Column '{y_col}' must be numeric for histogram")
-                ax.hist(self.df[y_col].dropna(), bins=20, edgecolor='black', alpha=0.7)
-                ax.set_xlabel(y_col)
-                ax.set_ylabel("Frequency")
-                ax.set_title(f"Histogram of {y_col}")
-            else:
-                # Apply aggregation
-                grouped = self.df.groupby(x_col)[y_col].agg(agg_func).reset_index()
-                x_data = grouped[x_col]
-                y_data = grouped[y_col]
-                
-                # Generate appropriate chart
-                if chart_type == "Bar":
-                    ax.bar(x_data, y_data, color='#2196F3', alpha=0.8)
-                    ax.set_xlabel(x_col)
-                    ax.set_ylabel(f"{agg_func}({y_col})")
-                    ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
-                    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-                    
-                elif chart_type == "Line":
-                    ax.plot(x_data, y_data, marker='o', color='#4CAF50', linewidth=2)
-                    ax.set_xlabel(x_col)
-                    ax.set_ylabel(f"{agg_func}({y_col})")
-                    ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
-                    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-                    
-                elif chart_type == "Pie":
-                    ax.pie(y_data, labels=x_data, autopct='%1.1f%%', startangle=90)
-                    ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
-                    
-                elif chart_type == "Scatter":
-                    ax.scatter(x_data, y_data, color='#FF9800', alpha=0.7, s=100)
-                    ax.set_xlabel(x_col)
-                    ax.set_ylabel(f"{agg_func}({y_col})")
-                    ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
-            
-            self.fig.tight_layout()
-            
-            # Embed chart in Tkinter
-            self.canvas_widget = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
-            self.canvas_widget.draw()
-            self.canvas_widget.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+            # Large Line/Scatter series are reduced to what the canvas can show
+            exact = self.exact_data_var.get()
+            width_px = self.chart_pixel_width()
+            decimation_note = None
+
+            self._ensure_canvas()
+            with self.perf.stage("draw", rows=None if data is None else len(data), chart=chart_title(spec)):
+                if chart_type == "Histogram" or not self._update_chart_in_place(
+                        chart_type, data, x_col, y_col, agg_func, exact, width_px, resample=spec.get('resample')):
+                    self.fig.clear()
+                    artist, decimation_note = draw_chart(
+                        self.fig, spec, data, width_px=width_px, exact=exact, histogram=result.get('histogram'),
+                        perf=self.perf
+                    )
+
+                    # Remember what is on screen so the next chart can reuse it
+                    self._chart_state = None
+                    if artist is not None:
+                        self._chart_state = {
+                            'chart_type': chart_type,
+                            'x_col': x_col,
+                            'resample': spec.get('resample'),
+                            'x_data': data[x_col],
+                            'ax': self.fig.axes[0],
+                            'artist': artist,
+                            'layout_key': self._layout_key(f"{agg_func}({y_col})", data[y_col]),
+                        }
+
+            self.canvas_widget.draw_idle()
             
             # Store chart info for analysis report
-            self.current_chart_info = {
-                'x_col': x_col,
-                'y_col': y_col,
-                'agg_func': agg_func,
-                'chart_type': chart_type,
-                'data': grouped if chart_type != "Histogram" else self.df[[y_col]].dropna()
-            }
+            self.current_chart_info = dict(spec, decimation=decimation_note, filters=self.filters, **result)
             
-            self.set_status(f"Chart generated: {chart_type} ({agg_func})")
+            status = f"Chart generated: {chart_type} ({agg_func})"
+            if decimation_note:
+                status += f" - {decimation_note}"
+            self.set_status(status)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate chart:\n{str(e)}")
             self.set_status("Chart generation failed")
     
+    def chart_pixel_width(self):
+        """Usable width of the chart area in pixels"""
+        width = self.chart_frame.winfo_width() - 20
+        return width if width > 100 else 600
+
+    def _ensure_canvas(self):
+        """Create the Figure and Tk canvas once and make sure it is shown"""
+        if self.fig is None:
+            self.fig = Figure(figsize=(6, 5), dpi=100)
+            self.canvas_widget = TimedCanvas(self.fig, master=self.chart_frame, perf=self.perf)
+        self.canvas_widget.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    @staticmethod
+    def _layout_key(ylabel, y_data):
+        """What tight_layout depends on beyond the X axis: label and tick widths"""
+        values = pd.to_numeric(y_data, errors="coerce").abs()
+        largest = values.max() if values.notna().any() else 0
+        return len(ylabel), len(f"{largest:,.0f}")
+
+    def _update_chart_in_place(self, chart_type, grouped, x_col, y_col, agg_func, exact, width_px, resample=None):
+        """Swap new Y values into the existing artists when only Y changed
+
+        Applies to Bar, Line and Scatter charts over the same X values (and
+        resampling) that need no decimation. Returns False when a full
+        redraw is needed.
+        """
+        state = self._chart_state
+        if state is None or state['chart_type'] != chart_type or state['x_col'] != x_col or \
+                state['resample'] != resample:
+            return False
+        y_data = grouped[y_col]
+        if not pd.api.types.is_numeric_dtype(y_data) or not state['x_data'].equals(grouped[x_col]):
+            return False
+        limit = LINE_POINTS_PER_PIXEL if chart_type == "Line" else SCATTER_POINTS_PER_PIXEL
+        if not exact and len(grouped) > limit * width_px:
+            return False
+
+        ax = state['ax']
+        artist = state['artist']
+        y_values = y_data.to_numpy(dtype=float)
+        if chart_type == "Bar":
+            for rect, height in zip(artist.patches, y_values):
+                rect.set_height(height)
+            ax.relim()
+        elif chart_type == "Line":
+            artist.set_ydata(y_values)
+            ax.relim()
+        elif chart_type == "Scatter":
+            # relim() ignores collections, so rebuild the data limits by hand
+            offsets = artist.get_offsets().copy()
+            offsets[:, 1] = y_values
+            artist.set_offsets(offsets)
+            ax.ignore_existing_data_limits = True
+            ax.update_datalim(offsets)
+        ax.autoscale_view()
+
+        ylabel = f"{agg_func}({y_col})"
+        ax.set_ylabel(ylabel)
+        ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
+
+        # Layout only needs recomputing if the Y labels changed width
+        layout_key = self._layout_key(ylabel, y_data)
+        if layout_key != state['layout_key']:
+            with self.perf.stage("tight_layout"):
+                self.fig.tight_layout()
+            state['layout_key'] = layout_key
+        return True
+
     def clear_chart(self):
         """Clear the current chart"""
+        # The Figure and canvas are kept and reused by the next chart
         if self.canvas_widget:
-            self.canvas_widget.get_tk_widget().destroy()
-            self.canvas_widget = None
+            self.canvas_widget.get_tk_widget().pack_forget()
         if self.fig:
-            plt.close(self.fig)
-            self.fig = None
+            self.fig.clear()
+        self._chart_state = None
         
         # Show placeholder again
         if hasattr(self, 'chart_placeholder'):
@@ -368,6 +1725,10 @@ class MiniExcelVisualizer:
             messagebox.showwarning("Warning", "Please generate a chart first to create an analysis report")
             return
         
+        if self.report_job is not None and not self.report_job.finished:
+            messagebox.showwarning("Warning", "A report is already being generated")
+            return
+
         try:
             filepath = filedialog.asksaveasfilename(
                 title="Save Analysis Report",
@@ -378,179 +1739,281 @@ class MiniExcelVisualizer:
             if not filepath:
                 return
             
-            # Create PDF
-            doc = SimpleDocTemplate(filepath, pagesize=A4)
-            elements = []
-            styles = getSampleStyleSheet()
-            
-            # Title
-            title = Paragraph(f"<b>Data Analysis Report</b>", styles['Title'])
-            elements.append(title)
-            elements.append(Spacer(1, 12))
-            
-            # Report metadata
-            metadata_text = f"""
-            <b>Dataset:</b> {self.filename}<br/>
-            <b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>
-            <b>Total Records:</b> {len(self.df)}<br/>
-            """
-            metadata = Paragraph(metadata_text, styles['Normal'])
-            elements.append(metadata)
-            elements.append(Spacer(1, 20))
-            
-            # Chart Configuration Section
-            chart_config_title = Paragraph("<b>Chart Configuration</b>", styles['Heading2'])
-            elements.append(chart_config_title)
-            elements.append(Spacer(1, 8))
-            
-            chart_info = self.current_chart_info
-            config_text = f"""
-            <b>Chart Type:</b> {chart_info['chart_type']}<br/>
-            <b>X-Axis:</b> {chart_info['x_col']}<br/>
-            <b>Y-Axis:</b> {chart_info['y_col']}<br/>
-            <b>Aggregation:</b> {chart_info['agg_func']}<br/>
-            """
-            config = Paragraph(config_text, styles['Normal'])
-            elements.append(config)
-            elements.append(Spacer(1, 20))
-            
-            # Data Analysis Section
-            analysis_title = Paragraph("<b>Data Analysis & Insights</b>", styles['Heading2'])
-            elements.append(analysis_title)
-            elements.append(Spacer(1, 8))
-            
-            # Generate insights based on chart type and data
-            insights = self.generate_insights()
-            
-            for insight in insights:
-                insight_para = Paragraph(f"• {insight}", styles['Normal'])
-                elements.append(insight_para)
-                elements.append(Spacer(1, 6))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Statistical Summary Section
-            stats_title = Paragraph("<b>Statistical Summary</b>", styles['Heading2'])
-            elements.append(stats_title)
-            elements.append(Spacer(1, 8))
-            
-            # Generate statistics
-            stats_data = self.generate_statistics()
-            
-            # Create statistics table
-            stats_table = Table(stats_data, colWidths=[200, 150])
-            stats_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(stats_table)
-            
-            # Build PDF
-            doc.build(elements)
-            
-            self.set_status(f"Analysis report saved: {os.path.basename(filepath)}")
-            messagebox.showinfo("Success", f"Analysis report generated successfully:\n{filepath}")
-            
+            total_records = self.total_rows if self.total_rows is not None else "Unknown (not yet scanned)"
+            chart_info = self.chart_info_with_summary()
+            exact = self.exact_data_var.get()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate report:\n{str(e)}")
             self.set_status("Report generation failed")
+            return
+
+        # Saving the same chart again with the same Exact data setting reuses its image
+        image = chart_info.get('images', {}).get(exact)
+        dataset_name = self.filename
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: self._build_report(
+                job, filepath, chart_info, dataset_name, total_records, exact, image, self.perf
+            )
+        )
+        job.on_progress = lambda fraction, message: self._on_report_progress(job, fraction, message)
+        job.on_done = lambda image: self._on_chart_report_done(job, filepath, chart_info, exact, image)
+        job.on_error = lambda e: self._on_report_error(job, e)
+        job.on_cancel = lambda: self._on_report_cancelled(job)
+
+        self.report_job = job
+        self.show_progress(lambda: self._on_report_cancelled(job))
+        self.set_status("Rendering chart for the report...")
+        job.start()
+
+    @staticmethod
+    def _build_report(job, filepath, chart_info, dataset_name, total_records, exact, image, perf):
+        """Worker: rasterize the chart (off-screen) unless image has it, build the PDF around it, return the image"""
+        if image is None:
+            buffer = io.BytesIO()
+            render_chart_image(
+                chart_info, chart_info['data'], buffer, histogram=chart_info.get('histogram'), exact=exact, perf=perf
+            )
+            image = buffer.getvalue()
+        if job.cancel_event.is_set():
+            raise OperationCancelled()
+        with perf.stage("report build", chart=chart_title(chart_info), file=os.path.basename(filepath)):
+            build_report(
+                filepath, chart_info, dataset_name, total_records,
+                chart_image=image, progress=job.report, cancel_event=job.cancel_event
+            )
+        return image
+
+    def _on_report_progress(self, job, fraction, message):
+        if job is not self.report_job:
+            return
+        if fraction is not None:
+            self.update_progress(fraction)
+        self.set_status(message)
+
+    def _on_chart_report_done(self, job, filepath, chart_info, exact, image):
+        if job is self.report_job:
+            # Kept per Exact data setting: the two render different images
+            chart_info.setdefault('images', {})[exact] = image
+        self._on_report_done(job, filepath)
+
+    def _on_report_done(self, job, filepath):
+        if job is not self.report_job:
+            return
+        self.report_job = None
+        self.hide_progress()
+        self.set_status(f"Analysis report saved: {os.path.basename(filepath)}")
+        messagebox.showinfo("Success", f"Analysis report generated successfully:\n{filepath}")
+
+    def _on_report_error(self, job, error):
+        if job is not self.report_job:
+            return
+        self.report_job = None
+        self.hide_progress()
+        messagebox.showerror("Error", f"Failed to generate report:\n{str(error)}")
+        self.set_status("Report generation failed")
+
+    def _on_report_cancelled(self, job):
+        if job is not self.report_job:
+            return
+        job.cancel()
+        self.report_job = None
+        self.hide_progress()
+        self.set_status("Report cancelled")
     
-    def generate_insights(self):
-        """Generate insights based on current chart and data"""
-        insights = []
-        chart_info = self.current_chart_info
-        data = chart_info['data']
-        
-        try:
-            if chart_info['chart_type'] == "Histogram":
-                # Histogram insights
-                y_col = chart_info['y_col']
-                mean_val = data[y_col].mean()
-                median_val = data[y_col].median()
-                std_val = data[y_col].std()
-                
-                insights.append(f"The average {y_col} is {mean_val:.2f} with a standard deviation of {std_val:.2f}")
-                insights.append(f"The median {y_col} is {median_val:.2f}, indicating the central tendency of the distribution")
-                
-                if mean_val > median_val * 1.1:
-                    insights.append(f"The distribution is right-skewed, with higher values pulling the average up")
-                elif median_val > mean_val * 1.1:
-                    insights.append(f"The distribution is left-skewed, with lower values pulling the average down")
-                else:
-                    insights.append(f"The distribution appears relatively symmetric")
-                    
-            else:
-                # Other chart types
-                x_col = chart_info['x_col']
-                y_col = chart_info['y_col']
-                agg_func = chart_info['agg_func']
-                
-                # Find top and bottom performers
-                if len(data) > 0:
-                    sorted_data = data.sort_values(by=y_col, ascending=False)
-                    top_item = sorted_data.iloc[0]
-                    bottom_item = sorted_data.iloc[-1]
-                    
-                    insights.append(f"'{top_item[x_col]}' has the highest {agg_func} {y_col} of {top_item[y_col]:.2f}")
-                    insights.append(f"'{bottom_item[x_col]}' has the lowest {agg_func} {y_col} of {bottom_item[y_col]:.2f}")
-                    
-                    # Calculate total and average
-                    total = data[y_col].sum()
-                    avg = data[y_col].mean()
-                    
-                    insights.append(f"Total {agg_func} across all categories: {total:.2f}")
-                    insights.append(f"Average {agg_func} per category: {avg:.2f}")
-                    
-                    # Top contributor percentage
-                    if total > 0:
-                        top_percentage = (top_item[y_col] / total) * 100
-                        insights.append(f"'{top_item[x_col]}' contributes {top_percentage:.1f}% of the total")
-                    
-                    # Comparison insight
-                    if len(data) >= 2:
-                        difference = top_item[y_col] - bottom_item[y_col]
-                        insights.append(f"There is a difference of {difference:.2f} between the highest and lowest values")
-                
-        except Exception as e:
-            insights.append("Analysis data unavailable for current configuration")
-        
-        return insights
-    
-    def generate_statistics(self):
-        """Generate statistical summary table"""
-        stats_data = [["Metric", "Value"]]
+    def selected_chart_spec(self):
+        """Chart spec from the dropdowns, or None after warning the user"""
+        x_col = self.x_column_var.get()
+        y_col = self.y_column_var.get()
+        if not x_col or not y_col:
+            messagebox.showwarning("Warning", "Please select both X and Y columns")
+            return None
+        chart_type = self.chart_type_var.get()
+        agg_func = self.agg_var.get()
+        if not self.is_numeric_column(y_col) and (chart_type == "Histogram" or agg_func != "count"):
+            messagebox.showwarning(
+                "Warning", f"Column '{y_col}' is not numeric: choose a numeric Y column or the count aggregation"
+            )
+            return None
+        resample = self.resample_var.get()
+        if chart_type == "Histogram" or resample == "none":
+            resample = None
+        elif not self.is_date_column(x_col):
+            if resample != "auto":
+                messagebox.showwarning("Warning", f"Column '{x_col}' is not a date column, so it cannot be resampled")
+                return None
+            resample = None
+        elif resample == "auto":
+            resample = self.auto_resample(x_col)
+        return {
+            'x_col': x_col,
+            'y_col': y_col,
+            'agg_func': agg_func,
+            'chart_type': chart_type,
+            'resample': resample,
+        }
+
+    def is_date_column(self, col):
+        """Whether col holds dates, as parsed by the load's column plan"""
+        return col in self.df.columns and pd.api.types.is_datetime64_any_dtype(self.df[col])
+
+    def auto_resample(self, x_col):
+        """Time unit for a date X column under "auto": from its full range, or day if that is unknown"""
+        profile = self.profile.get(x_col, {})
+        if 'min' in profile:
+            return auto_resample_unit(profile['min'], profile['max'])
+        if self.streaming or (self.lazy is not None and self.lazy.missing([x_col])):
+            # Only a preview is in memory, and its range says little about the file's
+            return "day"
+        values = self.data_frame([x_col])[x_col]
+        if values.count() == 0:
+            return "day"
+        return auto_resample_unit(values.min(), values.max())
+
+    def add_to_dashboard(self):
+        """Queue the selected chart for the dashboard report"""
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load a CSV file first")
+            return
+        spec = self.selected_chart_spec()
+        if spec is None:
+            return
+        if spec in self.dashboard_specs:
+            self.set_status(f"Already on the dashboard: {chart_title(spec)}")
+            return
+        self.dashboard_specs.append(spec)
+        self.update_dashboard_label()
+        self.set_status(f"Added to dashboard: {chart_title(spec)}")
+
+    def clear_dashboard(self):
+        """Empty the dashboard queue"""
+        self.dashboard_specs = []
+        self.update_dashboard_label()
+        self.set_status("Dashboard cleared")
+
+    def update_dashboard_label(self):
+        count = len(self.dashboard_specs)
+        self.dashboard_label.config(text=f"Dashboard: {count} chart{'s' if count != 1 else ''}")
+
+    def generate_dashboard_report(self):
+        """Render every queued chart into one PDF with a table of contents"""
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load a CSV file first")
+            return
+
+        if not self.dashboard_specs:
+            messagebox.showwarning("Warning", "Add charts to the dashboard first")
+            return
+
+        if self.report_job is not None and not self.report_job.finished:
+            messagebox.showwarning("Warning", "A report is already being generated")
+            return
+
+        columns = chart_columns(self.dashboard_specs, self.filters)
+        if not self.ensure_columns(columns, self.generate_dashboard_report):
+            return
+
+        filepath = filedialog.asksaveasfilename(
+            title="Save Dashboard Report",
+            defaultextension=".pdf",
+            filetypes=[("PDF Files", "*.pdf")]
+        )
+        if not filepath:
+            return
+
+        self.flush_appended_rows()
+        specs = list(self.dashboard_specs)
+        df = None if self.streaming else self.data_frame(columns)
+        exact = self.exact_data_var.get()
+        exact_stats = self.exact_stats_var.get()
+        # The worker gets a snapshot: the user may filter, chart or load meanwhile
+        filename = self.filename
+        source_path = self.source_path
+        plan = self.stream_plan
+        version = self.data_version
+        filters = tuple(self.filters)
+        job = BackgroundJob(
+            self.root,
+            target=lambda job: render_dashboard(
+                filepath, specs, filename,
+                df=df,
+                csv_path=source_path,
+                plan=plan,
+                cache=self.agg_cache,
+                version=version,
+                exact=exact,
+                exact_stats=exact_stats,
+                filters=filters,
+                progress=job.report,
+                cancel_event=job.cancel_event,
+                perf=self.perf
+            )
+        )
+        job.on_progress = lambda fraction, message: self._on_report_progress(job, fraction, message)
+        job.on_done = lambda result: self._on_report_done(job, filepath)
+        job.on_error = lambda e: self._on_report_error(job, e)
+        job.on_cancel = lambda: self._on_report_cancelled(job)
+
+        self.report_job = job
+        self.show_progress(lambda: self._on_report_cancelled(job))
+        self.set_status(f"Building dashboard of {len(specs)} charts...")
+        job.start()
+
+    def chart_info_with_summary(self):
+        """Current chart info with Histogram statistics filled in (cached per column)"""
         chart_info = self.current_chart_info
-        data = chart_info['data']
-        
-        try:
-            if chart_info['chart_type'] == "Histogram":
-                y_col = chart_info['y_col']
-                stats_data.append(["Mean", f"{data[y_col].mean():.2f}"])
-                stats_data.append(["Median", f"{data[y_col].median():.2f}"])
-                stats_data.append(["Std Dev", f"{data[y_col].std():.2f}"])
-                stats_data.append(["Min", f"{data[y_col].min():.2f}"])
-                stats_data.append(["Max", f"{data[y_col].max():.2f}"])
-                stats_data.append(["Count", f"{data[y_col].count()}"])
-            else:
-                y_col = chart_info['y_col']
-                stats_data.append(["Total Sum", f"{data[y_col].sum():.2f}"])
-                stats_data.append(["Average", f"{data[y_col].mean():.2f}"])
-                stats_data.append(["Median", f"{data[y_col].median():.2f}"])
-                stats_data.append(["Min Value", f"{data[y_col].min():.2f}"])
-                stats_data.append(["Max Value", f"{data[y_col].max():.2f}"])
-                stats_data.append(["Number of Categories", f"{len(data)}"])
-                
-        except Exception as e:
-            stats_data.append(["Error", "Statistics unavailable"])
-        
-        return stats_data
-    
+        if chart_info['chart_type'] != "Histogram":
+            return chart_info
+        if self.streaming:
+            # Out-of-core scans only have the sketched statistics
+            if self.exact_stats_var.get():
+                self.set_status("Exact statistics need the file in memory; the report uses approximate ones")
+            return chart_info
+
+        y_col = chart_info['y_col']
+        with self.perf.stage("statistics", rows=len(chart_info['data']), chart=chart_title(chart_info)):
+            chart_info['summary'] = summarize_column(
+                chart_info['data'][y_col],
+                exact=self.exact_stats_var.get(),
+                cache=self.agg_cache,
+                key=(filtered_version(self.data_version, chart_info.get('filters', ())), y_col)
+            )
+        return chart_info
+
+    def toggle_perf_panel(self):
+        """Show or hide the Performance panel above the status bar"""
+        if self.perf_after is not None:
+            self.root.after_cancel(self.perf_after)
+            self.perf_after = None
+            self.perf_panel.pack_forget()
+            self.btn_perf.config(text="⏱ Performance ▴")
+            return
+        self.perf_panel.pack(side=tk.BOTTOM, fill=tk.X, after=self.status_frame)
+        self.btn_perf.config(text="⏱ Performance ▾")
+        self.perf_shown = None
+        self.refresh_perf_panel()
+
+    def refresh_perf_panel(self):
+        """List the latest stage timings, newest first, while the panel is open"""
+        if self.perf.count != self.perf_shown:
+            self.perf_shown = self.perf.count
+            self.perf_tree.delete(*self.perf_tree.get_children())
+            fixed = {'stage', 'rows', 'start', 'wall_s', 'cpu_s', 'peak_bytes'}
+            for record in sorted(self.perf.snapshot(), key=lambda r: r['start'], reverse=True):
+                details = "; ".join(
+                    f"{key}={', '.join(value) if isinstance(value, list) else value}"
+                    for key, value in record.items() if key not in fixed
+                )
+                self.perf_tree.insert("", tk.END, values=(
+                    record['stage'],
+                    f"{record['wall_s'] * 1000:,.1f}",
+                    f"{record['cpu_s'] * 1000:,.1f}",
+                    "" if record['peak_bytes'] is None else format_bytes(record['peak_bytes']),
+                    "" if record['rows'] is None else f"{record['rows']:,}",
+                    details,
+                ))
+        self.perf_after = self.root.after(self.PERF_REFRESH_MS, self.refresh_perf_panel)
+
     def set_status(self, message):
         """Update status bar message"""
         self.status_bar.config(text=message)
@@ -0,0 +1,2944 @@
+"""GUI-free data pipeline: load, aggregate, chart and report
+
+Everything here runs without Tk, so it can be used by the desktop app and
+by headless batch jobs alike. Run it directly for batch rendering:
+
+    python engine.py sales.csv --chart region:revenue:sum:Bar --output reports/
+"""
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
+import operator
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.dates as mdates
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
+from reportlab.platypus.tableofcontents import TableOfContents
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# What writing a frame to the cache can fail with, e.g. an object column
+# mixing numbers and text that Arrow cannot type; the load goes on uncached
+CACHE_WRITE_ERRORS = (OSError, ValueError, TypeError) + ((pa.ArrowException,) if feather is not None else ())
+
+
+CSV_CHUNK_ROWS = 200_000
+SAMPLE_ROWS = 10_000
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# Column naming the file each row came from in multi-file loads
+SOURCE_COLUMN = "source_file"
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+# Bytes hashed from each end of the source file for the cache fingerprint
+FINGERPRINT_BLOCK = 1024 * 1024
+AGG_CACHE_MAX_BYTES = 256 * 1024 ** 2
+# Aggregations computed together in one groupby; mean is derived from sum / count
+BASE_AGGREGATIONS = ["sum", "count", "min", "max"]
+# Decimate once a chart has more points than this many per pixel column
+LINE_POINTS_PER_PIXEL = 2
+SCATTER_POINTS_PER_PIXEL = 1
+# Files larger than this share of RAM are streamed instead of loaded
+STREAM_MEMORY_FRACTION = 0.25
+# In-memory groupings of at least this many rows are split across worker processes
+PARALLEL_GROUPBY_MIN_ROWS = 5_000_000
+PARALLEL_GROUPBY_WORKERS = os.cpu_count() or 1
+# Histogram statistics are sketched (approximate median) above this many values
+APPROX_STATS_MIN_ROWS = 1_000_000
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+PROFILE_VERSION = 1
+QUANTILE_SKETCH_K = 2048
+STATS_CONFIDENCE = 0.99
+# Chart width assumed when there is no on-screen canvas to measure
+DEFAULT_CHART_WIDTH_PX = 600
+REPORT_IMAGE_DPI = 150
+# Stage timings kept in memory; set this variable to also append them to a JSON-lines file
+PERF_LOG_ENV = "DATAVISUALISER_PERF_LOG"
+PERF_RECORDS = 200
+WORKSPACE_SUFFIX = ".dvworkspace"
+WORKSPACE_VERSION = 1
+AGG_FUNCS = ["sum", "mean", "count", "min", "max"]
+CHART_TYPES = ["Bar", "Line", "Pie", "Scatter", "Histogram"]
+SPEC_KEYS = ('x_col', 'y_col', 'agg_func', 'chart_type', 'resample')
+
+# Units a date X column can be binned to (see time_bins), with the length
+# of one bin (months at their longest) and how its labels are written
+RESAMPLE_UNITS = ("minute", "hour", "day", "week", "month")
+RESAMPLE_SPANS = {
+    "minute": pd.Timedelta(minutes=1),
+    "hour": pd.Timedelta(hours=1),
+    "day": pd.Timedelta(days=1),
+    "week": pd.Timedelta(weeks=1),
+    "month": pd.Timedelta(days=31),
+}
+RESAMPLE_LABELS = {"minute": "%Y-%m-%d %H:%M", "hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%Y-%m"}
+# Automatic resampling picks the finest unit giving at most this many bins
+RESAMPLE_AUTO_BINS = 400
+
+
+class OperationCancelled(Exception):
+    """Raised inside a background job when the user pressed Cancel"""
+
+
+class PerfRecorder:
+    """Wall time, CPU time, peak memory and rows processed of each pipeline stage
+
+    Every stage() becomes a record dict. The latest max_records are kept in
+    records (all of them with None); with a log_path each is also appended
+    as one JSON line, tagged with the host and library versions so logs from
+    different machines and releases can be compared. CPU time is that of the
+    thread running the stage. Peak memory (above the stage's starting point)
+    comes from tracemalloc, which slows allocation-heavy stages down, so it
+    is only measured with trace_memory on; stages running at the same time
+    share one peak. A recorder can be passed to worker processes, whose
+    records go to the same log but not back into records.
+    """
+
+    def __init__(self, log_path=None, trace_memory=False, max_records=PERF_RECORDS):
+        self.log_path = log_path
+        self.trace_memory = trace_memory
+        self.records = deque(maxlen=max_records)
+        # Records ever made, so a viewer can tell when there are new ones
+        self.count = 0
+        self.context = {
+            'host': platform.node(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__,
+        }
+        self._lock = threading.Lock()
+        self._tracing = 0
+
+    def __getstate__(self):
+        return {'log_path': self.log_path, 'trace_memory': self.trace_memory, 'max_records': self.records.maxlen}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None, **fields):
+        """Time the body of a with block; it may fill in record['rows'] once known"""
+        record = dict(stage=name, rows=rows, **fields)
+        traced = self.trace_memory
+        if traced:
+            with self._lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                if self._tracing == 0:
+                    tracemalloc.reset_peak()
+                self._tracing += 1
+            start_memory = tracemalloc.get_traced_memory()[0]
+        record['start'] = time.time()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['wall_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.thread_time() - cpu
+            record['peak_bytes'] = None
+            if traced:
+                with self._lock:
+                    record['peak_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - start_memory)
+                    self._tracing -= 1
+                    if self._tracing == 0 and not self.trace_memory:
+                        tracemalloc.stop()
+            self._add(record)
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+            self.count += 1
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(dict(self.context, **record), default=str) + "\n")
+
+    def snapshot(self):
+        """The kept records, oldest first; safe while other threads record"""
+        with self._lock:
+            return list(self.records)
+
+    def set_trace_memory(self, enabled):
+        """Measure peak memory (or stop) for stages started from now on"""
+        with self._lock:
+            self.trace_memory = enabled
+            if not enabled and self._tracing == 0 and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.count += 1
+
+
+def perf_stage(perf, name, rows=None, **fields):
+    """perf.stage(...), or a do-nothing context when perf is None"""
+    if perf is None:
+        return contextlib.nullcontext({})
+    return perf.stage(name, rows=rows, **fields)
+
+
+def format_bytes(num_bytes):
+    """Human readable byte count, e.g. 1.5 GB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def _detect_date_format(values):
+    """Return a strftime format if every sampled value parses as a date, else None"""
+    try:
+        from pandas.tseries.api import guess_datetime_format
+    except ImportError:
+        return None
+
+    fmt = guess_datetime_format(str(values.iloc[0]))
+    if fmt is None:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    return fmt if parsed.notna().all() else None
+
+
+def infer_column_plan(filepath, sample_rows=SAMPLE_ROWS):
+    """Sample the head of a CSV and decide how each text column should be stored
+
+    Returns {column: ("datetime", format) | ("category", None)}. Numeric
+    columns are not listed; they are downcast after the full read instead,
+    once their real range is known.
+    """
+    sample = pd.read_csv(filepath, nrows=sample_rows)
+    plan = {}
+    for col in sample.columns:
+        values = sample[col]
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            continue
+        values = values.dropna()
+        if len(values) == 0:
+            continue
+
+        fmt = _detect_date_format(values)
+        if fmt is not None:
+            plan[col] = ("datetime", fmt)
+        elif values.nunique() <= len(values) * CATEGORY_MAX_RATIO:
+            plan[col] = ("category", None)
+    return plan
+
+
+def parse_dates(values, fmt):
+    """values as datetimes, or unchanged if that would lose any of them
+
+    fmt was guessed from a sample, so rows further on may be written
+    another way: values it cannot read are retried with per-value format
+    inference, and a column with text that is not a date at all stays text
+    rather than becoming NaT.
+    """
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    if (parsed.isna() & values.notna()).any():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = pd.to_datetime(values, format="mixed", errors="coerce")
+        if (parsed.isna() & values.notna()).any():
+            return values
+    return parsed
+
+
+def apply_column_plan(chunk, plan):
+    """Convert the columns of one parsed chunk according to the plan"""
+    for col, (kind, fmt) in plan.items():
+        if col not in chunk.columns:
+            continue
+        values = chunk[col]
+        if kind == "datetime":
+            chunk[col] = parse_dates(values, fmt)
+        elif kind == "category":
+            # A chunk may have parsed as numbers; keep categories as text
+            if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+                values = values.where(values.isna(), values.astype(str))
+            chunk[col] = values.astype("category")
+    return chunk
+
+
+def concat_chunks(chunks, plan):
+    """Concatenate typed chunks, keeping categorical columns categorical"""
+    for col, (kind, fmt) in plan.items():
+        if col not in chunks[0].columns:
+            continue
+        if kind == "datetime":
+            # A chunk that kept its dates as text (see parse_dates) makes
+            # the whole column text, with the parsed chunks written as ISO dates
+            if not all(pd.api.types.is_datetime64_any_dtype(chunk[col]) for chunk in chunks):
+                for chunk in chunks:
+                    values = chunk[col]
+                    if pd.api.types.is_datetime64_any_dtype(values):
+                        chunk[col] = values.astype(object).where(values.isna(), values.astype(str))
+            continue
+        if kind != "category":
+            continue
+        # Chunks only know their own categories; pd.concat would fall back
+        # to object unless every chunk shares the same sorted category set
+        categories = pd.Index(pd.unique(np.concatenate(
+            [chunk[col].cat.categories.to_numpy(dtype=object) for chunk in chunks]
+        ))).sort_values()
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def downcast_numeric(df):
+    """Shrink integer columns to the smallest integer dtype that holds them
+
+    Floats stay float64: grouped sums keep the column dtype, and float32
+    totals lose precision long before they overflow.
+    """
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            df[col] = pd.to_numeric(values, downcast="integer")
+    return df
+
+
+def memory_report(df, top=3):
+    """One-line summary of the frame's memory use, largest columns first"""
+    usage = df.memory_usage(index=False, deep=True).sort_values(ascending=False)
+    largest = ", ".join(f"{col} {format_bytes(int(size))}" for col, size in usage.head(top).items())
+    return f"Memory: {format_bytes(int(usage.sum()))} ({largest})"
+
+
+class _ByteLimit:
+    """Read-only view of the first limit bytes of an open binary file"""
+
+    def __init__(self, f, limit):
+        self.f = f
+        self.left = limit
+
+    def read(self, n=-1):
+        n = self.left if n is None or n < 0 else min(n, self.left)
+        data = self.f.read(n)
+        self.left -= len(data)
+        return data
+
+
+def complete_lines_end(filepath, size):
+    """Byte position just after the last newline in the first size bytes of a file (0 if none)"""
+    with open(filepath, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - FINGERPRINT_BLOCK)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def iter_csv_chunks(filepath, plan=None, usecols=None, progress=None, cancel_event=None, chunksize=CSV_CHUNK_ROWS,
+                    size=None):
+    """Yield typed chunks of a CSV, reporting (bytes_read, total_bytes, rows) after each one
+
+    size, if given, stops the read after that many bytes of the file.
+    """
+    plan = plan or {}
+    total_bytes = os.path.getsize(filepath) if size is None else size
+    rows = 0
+    with open(filepath, "rb") as f:
+        source = f if size is None else _ByteLimit(f, size)
+        for chunk in pd.read_csv(source, chunksize=chunksize, usecols=usecols):
+            if cancel_event is not None and cancel_event.is_set():
+                raise OperationCancelled()
+            rows += len(chunk)
+            yield apply_column_plan(chunk, plan)
+            if progress:
+                progress(f.tell(), total_bytes, rows)
+
+
+def read_csv_chunked(filepath, plan=None, progress=None, cancel_event=None, chunksize=CSV_CHUNK_ROWS, size=None):
+    """Read a whole CSV (or its first size bytes) in chunks, reporting (bytes_read, total_bytes, rows) after each one"""
+    plan = plan or {}
+    chunks = list(iter_csv_chunks(
+        filepath, plan, progress=progress, cancel_event=cancel_event, chunksize=chunksize, size=size
+    ))
+    if not chunks:
+        # Header-only file: the chunked reader yields nothing
+        return pd.read_csv(filepath)
+    return concat_chunks(chunks, plan)
+
+
+def ingest_csv(filepath, progress=None, cancel_event=None, size=None):
+    """Load a CSV into a typed, memory-lean DataFrame
+
+    A sample pass picks date and categorical columns, the full chunked read
+    converts them as it goes, and numeric columns are downcast at the end.
+    size, if given, limits the read to the file's first size bytes.
+    """
+    plan = infer_column_plan(filepath)
+    df = read_csv_chunked(filepath, plan=plan, progress=progress, cancel_event=cancel_event, size=size)
+    return downcast_numeric(df)
+
+
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+# Filter ops that only look at their own column's values, so they can be
+# evaluated chunk by chunk and pushed down into the columnar cache
+ROW_FILTER_OPS = set(COMPARISONS) | {"in", "between"}
+TIME_UNITS = ("minute", "hour", "day", "week")
+
+_FILTER_PATTERNS = [
+    ("top", re.compile(r"^top\s+(\d+)\s+(.+?)\s+by\s+(.+)$", re.IGNORECASE)),
+    ("last", re.compile(r"^(.+?)\s+last\s+(\d+)\s+(minute|hour|day|week)s?$", re.IGNORECASE)),
+    ("between", re.compile(r"^(.+?)\s+between\s+(.+?)\s+and\s+(.+)$", re.IGNORECASE)),
+    ("in", re.compile(r"^(.+?)\s+in\s+(.+)$", re.IGNORECASE)),
+    ("compare", re.compile(r"^(.+?)\s*(==|!=|<=|>=|<|>|=)\s*(.+)$")),
+]
+
+
+def _unquote(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    return text
+
+
+def parse_filters(text):
+    """Parse a filter bar string into a tuple of (column, op, value) predicates
+
+    Clauses are separated by ';' and all must hold:
+
+        region == North; amount > 100; status in open, pending
+        date between 2024-01-01 and 2024-03-31; date last 30 days
+        top 5 region by amount
+
+    Values stay text until they are compared with a column, so the tuple
+    is hashable and can key the mask and aggregation caches.
+    """
+    predicates = []
+    for clause in text.replace("\n", ";").split(";"):
+        clause = clause.strip()
+        if not clause:
+            continue
+        for kind, pattern in _FILTER_PATTERNS:
+            match = pattern.match(clause)
+            if match is None:
+                continue
+            if kind == "top":
+                n, column, by = match.groups()
+                predicates.append((_unquote(column), "top", (int(n), _unquote(by))))
+            elif kind == "last":
+                column, n, unit = match.groups()
+                predicates.append((_unquote(column), "last", (int(n), unit.lower())))
+            elif kind == "between":
+                column, low, high = match.groups()
+                predicates.append((_unquote(column), "between", (_unquote(low), _unquote(high))))
+            elif kind == "in":
+                column, values = match.groups()
+                predicates.append((_unquote(column), "in", tuple(_unquote(v) for v in values.split(","))))
+            else:
+                column, op, value = match.groups()
+                predicates.append((_unquote(column), "==" if op == "=" else op, _unquote(value)))
+            break
+        else:
+            raise ValueError(f"Cannot understand filter '{clause}'")
+    return tuple(predicates)
+
+
+def format_filters(filters):
+    """The filter bar text for a tuple of predicates"""
+    clauses = []
+    for column, op, value in filters:
+        if op == "top":
+            clauses.append(f"top {value[0]} {column} by {value[1]}")
+        elif op == "last":
+            clauses.append(f"{column} last {value[0]} {value[1]}s")
+        elif op == "between":
+            clauses.append(f"{column} between {value[0]} and {value[1]}")
+        elif op == "in":
+            clauses.append(f"{column} in {', '.join(value)}")
+        else:
+            clauses.append(f"{column} {op} {value}")
+    return "; ".join(clauses)
+
+
+def filter_columns(filters):
+    """Columns a set of filters reads"""
+    columns = []
+    for column, op, value in filters:
+        columns.append(column)
+        if op == "top":
+            columns.append(value[1])
+    return list(dict.fromkeys(columns))
+
+
+def _filter_value(values, text):
+    """Convert filter text to something comparable with a column's values"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Timestamp(text)
+    if pd.api.types.is_bool_dtype(values):
+        return text.strip().lower() in ("true", "1", "yes")
+    if pd.api.types.is_numeric_dtype(values):
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Filter value '{text}' is not a number") from None
+    return text
+
+
+def predicate_mask(df, predicate):
+    """Boolean numpy mask of the rows of df that satisfy one predicate"""
+    column, op, value = predicate
+    if column not in df.columns:
+        raise ValueError(f"Unknown filter column '{column}'")
+    values = df[column]
+    if op == "top":
+        n, by = value
+        if by not in df.columns:
+            raise ValueError(f"Unknown filter column '{by}'")
+        if not pd.api.types.is_numeric_dtype(df[by]):
+            raise ValueError(f"Column '{by}' must be numeric to rank by")
+        keep = df.groupby(column, observed=True)[by].sum().nlargest(n).index
+        mask = values.isin(keep)
+    elif op == "last":
+        n, unit = value
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            raise ValueError(f"'{column}' is not a date column")
+        mask = values > values.max() - pd.Timedelta(**{f"{unit}s": n})
+    elif op == "in":
+        mask = values.isin([_filter_value(values, v) for v in value])
+    elif op == "between":
+        low, high = (_filter_value(values, v) for v in value)
+        mask = (values >= low) & (values <= high)
+    else:
+        mask = COMPARISONS[op](values, _filter_value(values, value))
+    return np.asarray(mask.fillna(False), dtype=bool)
+
+
+def filter_mask(df, filters, cache=None, version=None):
+    """AND of the masks of all predicates, each cached as (version, "mask", predicate)
+
+    Caching per predicate lets charts of any type, and filter sets that
+    share clauses, reuse masks already computed for the same data.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for predicate in filters:
+        key = (version, "mask", predicate)
+        cached = cache.get(key) if cache is not None else None
+        if cached is None:
+            predicate_values = predicate_mask(df, predicate)
+            if cache is not None:
+                cache.put(key, pd.DataFrame({'mask': predicate_values}, copy=False))
+        else:
+            predicate_values = cached['mask'].to_numpy()
+        mask &= predicate_values
+    return mask
+
+
+def apply_filters(df, filters, columns=None, cache=None, version=None):
+    """The rows of df that pass every filter, optionally only the given columns"""
+    mask = filter_mask(df, filters, cache=cache, version=version)
+    columns = [c for c in dict.fromkeys(columns) if c in df.columns] if columns else list(df.columns)
+    return df.loc[mask, columns]
+
+
+def filtered_version(version, filters):
+    """Cache version for data seen through filters, so its aggregates are kept apart"""
+    return (version, tuple(filters)) if filters else version
+
+
+def _arrow_filter_mask(table, filters):
+    """Evaluate the row-wise predicates on an Arrow table, or None if there are none"""
+    mask = None
+    for column, op, value in filters:
+        if op not in ROW_FILTER_OPS or column not in table.column_names:
+            continue
+        arrow_type = table.schema.field(column).type
+        if pa.types.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        if pa.types.is_timestamp(arrow_type):
+            convert = lambda v: pa.scalar(pd.Timestamp(v), type=arrow_type)
+        elif pa.types.is_boolean(arrow_type):
+            convert = lambda v: v.strip().lower() in ("true", "1", "yes")
+        elif pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+            convert = float
+        else:
+            convert = str
+        values = table[column]
+        if op == "in":
+            clause = pc.is_in(values, value_set=pa.array([convert(v) for v in value]))
+        elif op == "between":
+            clause = pc.and_(pc.greater_equal(values, convert(value[0])), pc.less_equal(values, convert(value[1])))
+        else:
+            name = {"==": "equal", "!=": "not_equal", "<": "less", "<=": "less_equal",
+                    ">": "greater", ">=": "greater_equal"}[op]
+            clause = getattr(pc, name)(values, convert(value))
+        clause = pc.fill_null(clause, False)
+        if op == "!=":
+            # As in pandas, a missing value is not equal to anything
+            clause = pc.or_(clause, pc.is_null(values))
+        mask = clause if mask is None else pc.and_(mask, clause)
+    return mask
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "datavisualiser")
+
+
+class FrameCache:
+    """Feather sidecar files for parsed CSVs with size-bounded LRU eviction
+
+    Entries are keyed by a fingerprint of the source file: absolute path,
+    size, mtime and a hash of its first and last blocks. Feather files are
+    written uncompressed so they can be memory-mapped on the way back in.
+    The cache directory itself is the index: an entry's mtime is touched on
+    every hit and serves as its LRU timestamp, which keeps the cache safe to
+    share between worker processes. Column profiles (see dataset_profile)
+    are kept beside the entries as small JSON files under the same
+    fingerprint and evicted the same way. Needs pyarrow; without it the
+    cache is simply disabled.
+    """
+
+    SUFFIX = ".feather"
+    PROFILE_SUFFIX = ".profile.json"
+
+    def __init__(self, directory=None, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return feather is not None
+
+    @staticmethod
+    def fingerprint(filepath):
+        stat = os.stat(filepath)
+        digest = hashlib.sha1()
+        digest.update(f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        with open(filepath, "rb") as f:
+            digest.update(f.read(FINGERPRINT_BLOCK))
+            if stat.st_size > FINGERPRINT_BLOCK:
+                f.seek(max(FINGERPRINT_BLOCK, stat.st_size - FINGERPRINT_BLOCK))
+                digest.update(f.read(FINGERPRINT_BLOCK))
+        return digest.hexdigest()
+
+    def entry_path(self, filepath):
+        return os.path.join(self.directory, self.fingerprint(filepath) + self.SUFFIX)
+
+    def load(self, filepath, columns=None, filters=()):
+        """Return the cached frame for filepath, or None on a miss
+
+        columns limits the read to the columns needed (plus those filters
+        use), and row-wise filters are evaluated in Arrow on the
+        memory-mapped file, so only matching rows of those columns are
+        converted to pandas. Other filters are left for the caller. An entry
+        that cannot be read is deleted and reported as a miss.
+        """
+        if not self.enabled:
+            return None
+        path = self.entry_path(filepath)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + filter_columns(filters)))
+        try:
+            table = feather.read_table(path, columns=columns, memory_map=True)
+        except Exception:
+            # A truncated or corrupt entry is a miss; drop it so the reparse rewrites it
+            self.discard(path)
+            return None
+        try:
+            mask = _arrow_filter_mask(table, filters) if filters else None
+        except Exception:
+            # A value Arrow cannot compare: the caller filters the rows instead
+            mask = None
+        if mask is not None:
+            table = table.filter(mask)
+        try:
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        except Exception:
+            self.discard(path)
+            return None
+
+    def profile_path(self, filepath):
+        return os.path.join(self.directory, self.fingerprint(filepath) + self.PROFILE_SUFFIX)
+
+    def load_profile(self, filepath):
+        """Return the saved profile of filepath, {'rows': ..., 'columns': {...}}, or None"""
+        if not self.enabled:
+            return None
+        path = self.profile_path(filepath)
+        try:
+            with open(path) as f:
+                profile = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if profile.get('version') != PROFILE_VERSION:
+            return None
+        return profile
+
+    def store_profile(self, filepath, rows, columns):
+        """Save column profiles of filepath's rows rows next to its cache entry"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.profile_path(filepath)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({'version': PROFILE_VERSION, 'rows': rows, 'columns': columns}, f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict(keep=path)
+
+    def store(self, filepath, df):
+        """Write df as the cache entry for filepath and evict old entries"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.entry_path(filepath)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict(keep=path)
+
+    def discard(self, path):
+        """Delete a cache file, if it is still there"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith((self.SUFFIX, self.PROFILE_SUFFIX)):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def load_dataset(filepath, cache=None, force_reparse=False, progress=None, cancel_event=None,
+                 columns=None, filters=(), perf=None, size=None):
+    """Load a CSV through the columnar cache, returning (df, from_cache)
+
+    progress, if given, is called as progress(fraction, message). columns
+    and filters are pushed down into cache hits (see FrameCache.load); the
+    rows returned may still include some that fail the filters, so callers
+    apply them as usual. perf, a PerfRecorder, times the cache read, parse
+    and cache write stages. size limits the parse to the file's first size
+    bytes, e.g. its length when the load started, so that rows appended
+    meanwhile are never half read; the cache is only used while the file
+    still has that length.
+    """
+    filename = os.path.basename(filepath)
+    if size is not None and os.path.getsize(filepath) != size:
+        cache = None
+    if cache is not None and not force_reparse:
+        with perf_stage(perf, "cache read", file=filename) as record:
+            df = cache.load(filepath, columns=columns, filters=filters)
+            record['hit'] = df is not None
+            record['rows'] = None if df is None else len(df)
+        if df is not None:
+            return df, True
+
+    def report(bytes_read, total, rows):
+        if progress:
+            progress(
+                bytes_read / total if total else 1.0,
+                f"Loading: {filename} - {format_bytes(bytes_read)} of {format_bytes(total)}, {rows:,} rows"
+            )
+
+    with perf_stage(perf, "parse", file=filename) as record:
+        df = ingest_csv(filepath, progress=report, cancel_event=cancel_event, size=size)
+        record['rows'] = len(df)
+    # An entry is keyed by the file as it is now, so it must hold all of it
+    if cache is not None and cache.enabled and (size is None or os.path.getsize(filepath) == size):
+        if progress:
+            progress(1.0, f"Caching: {filename}...")
+        try:
+            with perf_stage(perf, "cache write", rows=len(df), file=filename):
+                cache.store(filepath, df)
+        except CACHE_WRITE_ERRORS:
+            # The cache is an optimisation; a full disk or an untypable column must not fail the load
+            pass
+    if columns is not None:
+        df = df[list(dict.fromkeys(list(columns) + filter_columns(filters)))]
+    return df, False
+
+
+def load_dataset_snapshot(filepath, **kwargs):
+    """load_dataset() of the file as it is at the call, returning (df, from_cache, offset, size)
+
+    size is the length of the file that was parsed. offset is the byte
+    position just after the last complete line in it, where a FileTail
+    should start reading appended rows; it is less than size when the last
+    line had no newline yet, in which case df's last row may be only part
+    of a line that is still being written.
+    """
+    size = os.path.getsize(filepath)
+    df, from_cache = load_dataset(filepath, size=size, **kwargs)
+    return df, from_cache, complete_lines_end(filepath, size), size
+
+
+def expand_sources(patterns):
+    """The files named by paths and glob patterns, each pattern's matches sorted, without duplicates"""
+    paths = []
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if any(char in pattern for char in "*?["):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise FileNotFoundError(f"No files match '{pattern}'")
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def describe_sources(paths):
+    """Short name for a multi-file dataset"""
+    if len(paths) == 1:
+        return os.path.basename(paths[0])
+    return f"{os.path.basename(paths[0])} and {len(paths) - 1} more files"
+
+
+def source_names(paths):
+    """Distinct labels for the files of a multi-file load: base names, or paths below their common folder"""
+    names = [os.path.basename(path) for path in paths]
+    if len(set(names)) < len(names):
+        root = os.path.commonpath([os.path.abspath(path) for path in paths])
+        names = [os.path.relpath(os.path.abspath(path), root) for path in paths]
+    return names
+
+
+def infer_sources_plan(paths, sample_rows=SAMPLE_ROWS):
+    """Columns and column plan shared by several CSVs, returning (columns, plan)
+
+    columns is the union of the files' headers in first-seen order. Each
+    column is planned from a sample of the first file that has it, so a
+    set of shards with the same header is sampled once.
+    """
+    columns = {}
+    plan = {}
+    for path in paths:
+        header = pd.read_csv(path, nrows=0).columns
+        new = [col for col in header if col not in columns]
+        columns.update(dict.fromkeys(header))
+        if new:
+            file_plan = infer_column_plan(path, sample_rows=sample_rows)
+            plan.update((col, file_plan[col]) for col in new if col in file_plan)
+    return list(columns), plan
+
+
+def _load_shard(filepath, plan, cache=None, force_reparse=False):
+    """Worker: one CSV of a multi-file load typed by the shared plan, returning (df, from_cache)
+
+    The file goes through load_dataset(), so its cache entry holds the
+    file's own typing, as a later single-file load expects; the shared
+    plan is applied to the frame afterwards.
+    """
+    df, from_cache = load_dataset(filepath, cache=cache, force_reparse=force_reparse)
+    for col in df.columns:
+        values = df[col]
+        # Categories of this file alone that the shared plan keeps as plain values
+        if isinstance(values.dtype, pd.CategoricalDtype) and plan.get(col, (None, None))[0] != "category":
+            df[col] = values.astype(values.cat.categories.dtype)
+    return apply_column_plan(df, plan), from_cache
+
+
+def load_sources(paths, cache=None, force_reparse=False, source_column=None, jobs=None, progress=None,
+                 cancel_event=None, perf=None):
+    """Load several CSVs with one schema as a single frame, returning (df, files_from_cache)
+
+    The files are parsed in spawned worker processes (jobs, default one per
+    core), each through the columnar cache like load_dataset(), with the
+    plan from infer_sources_plan() so every file gets the same dtypes.
+    Columns a file lacks are filled with missing values. The frames are
+    concatenated in one pass, in the order of paths. source_column, if
+    given, names a categorical column holding each row's file (see
+    source_names). progress(fraction, message) is called as each file
+    finishes.
+    """
+    if source_column is not None and len(paths) != len(set(paths)):
+        raise ValueError("The same file is listed twice")
+    with perf_stage(perf, "plan", files=len(paths)):
+        columns, plan = infer_sources_plan(paths)
+    if source_column is not None and source_column in columns:
+        raise ValueError(f"The files already have a '{source_column}' column")
+
+    frames = [None] * len(paths)
+    cached = 0
+
+    def finished(i, result):
+        nonlocal cached
+        frames[i], from_cache = result
+        cached += from_cache
+        if progress:
+            done = sum(frame is not None for frame in frames)
+            progress(
+                done / len(paths),
+                f"Loading: {done} of {len(paths)} files - {os.path.basename(paths[i])}, {len(frames[i]):,} rows"
+            )
+
+    with perf_stage(perf, "parse", files=len(paths)) as record:
+        if len(paths) == 1 or jobs == 1 or multiprocessing.parent_process() is not None:
+            for i, path in enumerate(paths):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled()
+                finished(i, _load_shard(path, plan, cache, force_reparse))
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+                futures = {
+                    pool.submit(_load_shard, path, plan, cache, force_reparse): i for i, path in enumerate(paths)
+                }
+                for future in as_completed(futures):
+                    if cancel_event is not None and cancel_event.is_set():
+                        pool.shutdown(cancel_futures=True)
+                        raise OperationCancelled()
+                    finished(futures[future], future.result())
+        record['rows'] = sum(len(frame) for frame in frames)
+        record['cached'] = cached
+
+    with perf_stage(perf, "concat", rows=record['rows'], files=len(paths)):
+        for i, frame in enumerate(frames):
+            missing = [col for col in columns if col not in frame.columns]
+            if missing:
+                frame = frame.reindex(columns=columns)
+                frames[i] = apply_column_plan(frame, {col: plan[col] for col in missing if col in plan})
+            elif list(frame.columns) != columns:
+                frames[i] = frame[columns]
+        lengths = [len(frame) for frame in frames]
+        df = downcast_numeric(concat_chunks(frames, plan))
+        frames.clear()
+        if source_column is not None:
+            codes = np.repeat(np.arange(len(paths), dtype=np.min_scalar_type(len(paths))), lengths)
+            df[source_column] = pd.Categorical.from_codes(codes, categories=source_names(paths))
+    return df, cached
+
+
+class ColumnStore:
+    """A CSV opened lazily: header and sample up front, full columns on demand
+
+    Opening reads only the first rows (preview), which is enough for the
+    column lists and the table. A full column is parsed the first time a
+    chart needs it - from the Feather cache entry if the file has one,
+    otherwise from the CSV with usecols - and is kept, so load time and
+    memory grow with the columns actually used, not the width of the file.
+    read() is safe to run on a worker thread; add() and frame() are not.
+    """
+
+    def __init__(self, filepath, cache=None, sample_rows=SAMPLE_ROWS, perf=None):
+        self.filepath = filepath
+        self.cache = cache
+        self.perf = perf
+        with perf_stage(perf, "preview", file=os.path.basename(filepath)) as record:
+            self.plan = infer_column_plan(filepath, sample_rows=sample_rows)
+            self.preview = apply_column_plan(pd.read_csv(filepath, nrows=sample_rows), self.plan)
+            record['rows'] = len(self.preview)
+        self.columns = list(self.preview.columns)
+        self.loaded = None
+
+    @property
+    def rows(self):
+        """Row count of the full file, known once any column is loaded"""
+        return None if self.loaded is None else len(self.loaded)
+
+    def missing(self, columns):
+        """The columns of the file among columns that are not loaded yet"""
+        loaded = set() if self.loaded is None else set(self.loaded.columns)
+        return [col for col in dict.fromkeys(columns) if col in self.columns and col not in loaded]
+
+    def read(self, columns, progress=None, cancel_event=None):
+        """Parse whole columns, returning (frame, from_cache); progress(fraction, message)"""
+        columns = list(columns)
+        filename = os.path.basename(self.filepath)
+        if self.cache is not None:
+            with perf_stage(self.perf, "cache read", file=filename, columns=columns) as record:
+                df = self.cache.load(self.filepath, columns=columns)
+                record['hit'] = df is not None
+                record['rows'] = None if df is None else len(df)
+            if df is not None:
+                return df, True
+
+        def report(bytes_read, total, rows):
+            if progress:
+                progress(
+                    bytes_read / total if total else 1.0,
+                    f"Loading {', '.join(columns)} from {filename} - {format_bytes(bytes_read)} of {format_bytes(total)}"
+                )
+
+        with perf_stage(self.perf, "parse", file=filename, columns=columns) as record:
+            chunks = list(iter_csv_chunks(
+                self.filepath, self.plan, usecols=columns, progress=report, cancel_event=cancel_event
+            ))
+            if chunks:
+                df = downcast_numeric(concat_chunks(chunks, self.plan))
+            else:
+                df = pd.read_csv(self.filepath, usecols=columns)
+            record['rows'] = len(df)
+        return df, False
+
+    def add(self, frame):
+        """Keep columns returned by read()"""
+        frame = frame.reset_index(drop=True)
+        if self.loaded is None:
+            self.loaded = frame
+            return
+        if len(frame) != len(self.loaded):
+            raise ValueError(f"{os.path.basename(self.filepath)} changed since it was opened; load it again")
+        new_columns = [col for col in frame.columns if col not in self.loaded.columns]
+        self.loaded = pd.concat([self.loaded, frame[new_columns]], axis=1)
+
+    def frame(self, columns):
+        """All rows of the loaded columns among columns; others are left out"""
+        if self.loaded is None:
+            return pd.DataFrame()
+        return self.loaded[[col for col in dict.fromkeys(columns) if col in self.loaded.columns]]
+
+
+class FileReplaced(Exception):
+    """A watched file shrank, so it was truncated or replaced rather than appended to"""
+
+
+class FileTail:
+    """Parse only the rows appended to a CSV since the last read
+
+    offset is where the load stopped parsing, just after its last complete
+    line (see load_dataset_snapshot; default: the file's current size).
+    Each read_new() parses the complete lines written after it and advances
+    it; a line still being written is left for the next call. New rows get
+    the header's columns and the given column plan.
+    """
+
+    def __init__(self, filepath, plan=None, offset=None):
+        self.filepath = filepath
+        self.plan = plan or {}
+        self.columns = list(pd.read_csv(filepath, nrows=0).columns)
+        self.offset = os.path.getsize(filepath) if offset is None else offset
+
+    def read_new(self):
+        size = os.path.getsize(self.filepath)
+        if size < self.offset:
+            raise FileReplaced(f"{os.path.basename(self.filepath)} was truncated or replaced")
+        data = b""
+        if size > self.offset:
+            with open(self.filepath, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return pd.DataFrame(columns=self.columns)
+        self.offset += end
+        rows = pd.read_csv(io.BytesIO(data[:end]), header=None, names=self.columns)
+        return apply_column_plan(rows, self.plan)
+
+
+def physical_memory():
+    """Total RAM in bytes, or None where the platform does not report it"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def should_stream(filepath):
+    """True if a CSV is too large to load into memory comfortably"""
+    memory = physical_memory()
+    return memory is not None and os.path.getsize(filepath) > STREAM_MEMORY_FRACTION * memory
+
+
+def load_preview(filepath, rows=SAMPLE_ROWS, perf=None):
+    """Read the first rows of a CSV for display, returning (preview_df, plan)
+
+    Used in out-of-core mode, where the full file is only ever scanned
+    chunk by chunk. Only the date part of the plan applies to streaming:
+    per-chunk categoricals would each have different categories.
+    """
+    with perf_stage(perf, "preview", file=os.path.basename(filepath)) as record:
+        plan = infer_column_plan(filepath, sample_rows=rows)
+        preview = apply_column_plan(pd.read_csv(filepath, nrows=rows), plan)
+        record['rows'] = len(preview)
+    stream_plan = {col: entry for col, entry in plan.items() if entry[0] == "datetime"}
+    return preview, stream_plan
+
+
+class AggregationCache:
+    """LRU cache of grouped aggregate frames, bounded by their memory use
+
+    Safe to share between threads: the GUI's chart and report workers fill
+    it while the Tk thread reads it.
+    """
+
+    def __init__(self, max_bytes=AGG_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (frame, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+def _json_default(value):
+    """Make numpy scalars (and anything else json cannot take) serialisable"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _as_tuples(value):
+    """Undo JSON's turning of tuples into lists, so cache keys hash again"""
+    return tuple(_as_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def _frame_bytes(frame):
+    """A frame as compressed Feather; a meaningful index is kept as a column"""
+    index_name = None
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.name is not None:
+        index_name = frame.index.name
+        frame = frame.rename_axis("__index__").reset_index()
+    buffer = io.BytesIO()
+    feather.write_feather(frame, buffer, compression="zstd")
+    return buffer.getvalue(), index_name
+
+
+def _frame_from_bytes(data, index_name):
+    frame = feather.read_table(pa.BufferReader(data)).to_pandas()
+    if "__index__" in frame.columns:
+        # set_index() would widen small integer keys to int64
+        frame.index = pd.Index(frame.pop("__index__"), name=index_name)
+    return frame
+
+
+def save_workspace(path, source, state, filters=(), chart=None, cache=None, version=None):
+    """Save a session: its data file, GUI state, filters, shown chart and computed aggregates
+
+    source is a CSV path, or a list of them for a multi-file load. The
+    workspace is a zip of manifest.json - source path(s) and fingerprint(s),
+    state (any JSON-able dict), filters and an index of the frames - and one
+    zstd-compressed Feather file per frame. chart is the shown chart's
+    result (see _show_chart); its raw Histogram data is saved as bins.
+    Aggregates are the cache entries of data version version and its
+    filtered views, keyed without the version so they can be put back under
+    another one (see restore_aggregates). Without pyarrow only the manifest
+    is written.
+    """
+    multiple = not isinstance(source, str)
+    paths = list(source) if multiple else [source]
+    fingerprints = [FrameCache.fingerprint(filepath) for filepath in paths]
+    manifest = {
+        'version': WORKSPACE_VERSION,
+        'source': [os.path.abspath(filepath) for filepath in paths] if multiple else os.path.abspath(source),
+        'fingerprint': fingerprints if multiple else fingerprints[0],
+        'state': state,
+        'filters': filters,
+        'chart': None,
+        'aggregates': [],
+    }
+    frames = {}
+    if feather is not None and chart is not None:
+        histogram = chart.get('histogram')
+        if histogram is None and chart['chart_type'] == "Histogram":
+            histogram = np.histogram(chart['data'][chart['y_col']], bins=20)
+        entry = {'spec': chart_spec(chart), 'summary': chart.get('summary'), 'data': None, 'histogram': None}
+        if chart['chart_type'] != "Histogram":
+            frames['chart.feather'], _ = _frame_bytes(chart['data'])
+            entry['data'] = 'chart.feather'
+        if histogram is not None:
+            counts, edges = histogram
+            frames['histogram.feather'], _ = _frame_bytes(
+                pd.DataFrame({'left': edges[:-1], 'right': edges[1:], 'count': counts})
+            )
+            entry['histogram'] = 'histogram.feather'
+        manifest['chart'] = entry
+    if feather is not None and cache is not None:
+        for key in cache.keys():
+            if key[0] == version:
+                filters = ()
+            elif isinstance(key[0], tuple) and key[0][0] == version:
+                filters = key[0][1]
+            else:
+                continue
+            if key[1] == "mask":
+                # Row masks are as long as the data and cheap to recompute
+                continue
+            name = f"aggregate{len(manifest['aggregates'])}.feather"
+            frames[name], index_name = _frame_bytes(cache.get(key))
+            manifest['aggregates'].append({'file': name, 'filters': filters, 'key': key[1:], 'index': index_name})
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        # The frames are compressed already; the zip only bundles them
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as archive:
+            archive.writestr("manifest.json", json.dumps(manifest, default=_json_default))
+            for name, data in frames.items():
+                archive.writestr(name, data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_workspace(path):
+    """Read a workspace written by save_workspace()
+
+    Returns a dict with 'source' (a path or list of paths), 'state',
+    'filters', 'current' (whether the source files still have the
+    fingerprints they were saved with), 'chart' (the spec
+    plus 'data', 'histogram' and 'summary' as _show_chart takes them, or
+    None) and 'aggregates', a list of (filters, key, frame).
+    """
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        if manifest.get('version') != WORKSPACE_VERSION:
+            raise ValueError(f"{os.path.basename(path)} was saved by an incompatible version")
+        source = manifest['source']
+        paths = source if isinstance(source, list) else [source]
+        fingerprints = manifest['fingerprint'] if isinstance(source, list) else [manifest['fingerprint']]
+        try:
+            current = [FrameCache.fingerprint(filepath) for filepath in paths] == fingerprints
+        except OSError:
+            current = False
+
+        chart = None
+        entry = manifest['chart']
+        if entry is not None:
+            chart = dict(entry['spec'], data=None, histogram=None, summary=entry['summary'])
+            if entry['data'] is not None:
+                chart['data'] = _frame_from_bytes(archive.read(entry['data']), None)
+            if entry['histogram'] is not None:
+                bins = _frame_from_bytes(archive.read(entry['histogram']), None)
+                chart['histogram'] = (bins['count'].to_numpy(), np.append(bins['left'].to_numpy(), bins['right'].iloc[-1]))
+        aggregates = [
+            (_as_tuples(item['filters']), _as_tuples(item['key']), _frame_from_bytes(archive.read(item['file']), item['index']))
+            for item in manifest['aggregates']
+        ]
+    return {
+        'source': source,
+        'state': manifest['state'],
+        'filters': _as_tuples(manifest['filters']),
+        'current': current,
+        'chart': chart,
+        'aggregates': aggregates,
+    }
+
+
+def restore_aggregates(cache, version, aggregates):
+    """Put aggregates read by load_workspace() back in cache under data version version"""
+    for filters, key, frame in aggregates:
+        cache.put((filtered_version(version, filters),) + key, frame)
+
+
+_groupby_pool = None
+_groupby_pool_lock = threading.Lock()
+
+
+def _shared_array(values):
+    """Copy a numpy array into a new shared memory block, returning (block, spec)"""
+    block = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+    return block, (block.name, values.shape, values.dtype.str)
+
+
+def _partition_aggregates(codes_spec, value_specs, partition, partitions):
+    """Worker: sum/count/min/max per group code of the groups in one partition"""
+    blocks = []
+    try:
+        def attach(spec):
+            name, shape, dtype = spec
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+        codes = attach(codes_spec)
+        mask = (codes % partitions == partition) & (codes >= 0)
+        keys = codes[mask]
+        results = {}
+        for y_col, spec in value_specs.items():
+            results[y_col] = pd.Series(attach(spec)[mask]).groupby(keys).agg(BASE_AGGREGATIONS)
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _parallel_groupby_pool():
+    global _groupby_pool
+    with _groupby_pool_lock:
+        if _groupby_pool is None:
+            # Spawned, not forked: the GUI calls this with other threads running
+            _groupby_pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_GROUPBY_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _groupby_pool
+
+
+def parallel_base_aggregates(df, x_col, y_cols, partitions=None):
+    """sum/count/min/max of numeric y_cols grouped by x_col, computed in worker processes
+
+    Returns {y_col: frame}, each exactly equal to
+    df.groupby(x_col, observed=True)[y_col].agg(BASE_AGGREGATIONS). The
+    X column is factorized here, and the group codes and Y values are shared
+    with the workers through shared memory. Rows are split by group (code
+    modulo the partition count) rather than by position, so every group is
+    reduced by one worker over its rows in their original order and float
+    sums come out bit for bit the same. Parallelism is therefore bounded by
+    the number of groups. partitions defaults to one per worker.
+    """
+    codes, uniques = pd.factorize(df[x_col], sort=True)
+    partitions = max(1, min(partitions or PARALLEL_GROUPBY_WORKERS, len(uniques)))
+    codes = codes.astype(np.min_scalar_type(-max(len(uniques), 1)), copy=False)
+
+    blocks = []
+    try:
+        block, codes_spec = _shared_array(codes)
+        blocks.append(block)
+        value_specs = {}
+        for y_col in y_cols:
+            block, value_specs[y_col] = _shared_array(df[y_col].to_numpy())
+            blocks.append(block)
+        pool = _parallel_groupby_pool()
+        futures = [
+            pool.submit(_partition_aggregates, codes_spec, value_specs, partition, partitions)
+            for partition in range(partitions)
+        ]
+        partials = [future.result() for future in futures]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    results = {}
+    for y_col in y_cols:
+        stats = pd.concat([partial[y_col] for partial in partials]).sort_index()
+        index = pd.Index(uniques.take(stats.index.to_numpy()), name=x_col)
+        # groupby() infers the key type of object columns, e.g. str for text
+        stats.index = index.infer_objects() if index.dtype == object else index
+        results[y_col] = stats
+    return results
+
+
+def use_parallel_groupby(df, x_col, y_cols):
+    """True if grouping df by x_col for y_cols is worth spreading over worker processes
+
+    Never inside a worker process: batch workers already keep every core
+    busy, and a pool they started would outlive them.
+    """
+    if PARALLEL_GROUPBY_WORKERS < 2 or len(df) < PARALLEL_GROUPBY_MIN_ROWS:
+        return False
+    if multiprocessing.parent_process() is not None:
+        return False
+    for y_col in y_cols:
+        dtype = df[y_col].dtype
+        if y_col == x_col or not isinstance(dtype, np.dtype) or dtype.kind not in "biuf":
+            return False
+    return True
+
+
+def base_aggregates(df, x_col, y_cols):
+    """{y_col: sum/count/min/max frame} of df grouped by x_col
+
+    Large frames go through parallel_base_aggregates(), with identical
+    results. Raises TypeError for Y columns these cannot be computed for.
+    """
+    if use_parallel_groupby(df, x_col, y_cols):
+        global _groupby_pool
+        try:
+            return parallel_base_aggregates(df, x_col, y_cols)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): start a fresh pool next time
+            with _groupby_pool_lock:
+                _groupby_pool = None
+    if len(y_cols) == 1:
+        return {y_cols[0]: df.groupby(x_col, observed=True)[y_cols[0]].agg(BASE_AGGREGATIONS)}
+    stats = df.groupby(x_col, observed=True)[y_cols].agg(BASE_AGGREGATIONS)
+    return {y_col: stats[y_col].rename_axis(columns=None) for y_col in y_cols}
+
+
+def time_bins(values, unit):
+    """Timestamps floored to the start of their minute, hour, day, week (Mondays) or month"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        raise ValueError(f"Column '{values.name}' is not a date column, so it cannot be resampled")
+    if unit == "week":
+        days = values.dt.normalize()
+        return days - pd.to_timedelta(days.dt.dayofweek, unit="D")
+    if unit == "month":
+        days = values.dt.normalize()
+        return days - pd.to_timedelta(days.dt.day - 1, unit="D")
+    return values.dt.floor({"minute": "min", "hour": "h", "day": "D"}[unit])
+
+
+def auto_resample_unit(start, end, max_bins=RESAMPLE_AUTO_BINS):
+    """The finest of RESAMPLE_UNITS that splits start..end into at most max_bins bins"""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for unit in RESAMPLE_UNITS:
+        if span / RESAMPLE_SPANS[unit] < max_bins:
+            return unit
+    return RESAMPLE_UNITS[-1]
+
+
+def group_key(x_col, unit=None):
+    """What data is grouped by, as cached: x_col, or (x_col, unit) when it is binned in time"""
+    return x_col if unit is None else (x_col, unit)
+
+
+def resampled_frame(df, x_col, y_cols, unit):
+    """x_col binned to unit (see time_bins) next to y_cols, ready to group by x_col"""
+    frame = {x_col: time_bins(df[x_col], unit)}
+    frame.update((y_col, df[y_col]) for y_col in y_cols if y_col != x_col)
+    return pd.DataFrame(frame)
+
+
+def grouped_aggregate(df, x_col, y_col, agg_func, cache=None, version=None, unit=None):
+    """Group df by x_col and aggregate y_col, returning a frame with both columns
+
+    sum, count, min and max are computed together over one grouping and
+    cached under (version, x_col, y_col), so switching aggregation or chart
+    type for the same columns does not regroup the data. Columns that do not
+    support all four (e.g. dates) fall back to the single requested function.
+    With a unit, a date x_col is grouped by time bins instead of its raw
+    values; the result is sorted by time and cached under group_key().
+    """
+    key = (version, group_key(x_col, unit), y_col)
+    stats = cache.get(key) if cache is not None else None
+    if stats is None and unit is not None:
+        df = resampled_frame(df, x_col, [y_col], unit)
+    if stats is None:
+        try:
+            stats = base_aggregates(df, x_col, [y_col])[y_col]
+        except TypeError:
+            stats = None
+        if stats is not None and cache is not None:
+            cache.put(key, stats)
+
+    if stats is not None:
+        return select_aggregate(stats, y_col, agg_func)
+
+    single_key = (version, group_key(x_col, unit), y_col, agg_func)
+    values = cache.get(single_key) if cache is not None else None
+    if values is None:
+        values = df.groupby(x_col, observed=True)[y_col].agg(agg_func)
+        if cache is not None:
+            cache.put(single_key, values.to_frame())
+    else:
+        values = values[y_col]
+    return values.rename(y_col).reset_index()
+
+
+def select_aggregate(stats, y_col, agg_func):
+    """Pick one aggregation out of a sum/count/min/max frame as an (x, y) frame"""
+    if agg_func == "mean":
+        values = stats["sum"] / stats["count"]
+    else:
+        values = stats[agg_func]
+    return values.rename(y_col).reset_index()
+
+
+def aggregate_many(df, x_col, y_cols, cache, version=None, unit=None):
+    """Group df by x_col once for several Y columns, filling the cache grouped_aggregate reads
+
+    Y columns that are already cached, not numeric, or x_col itself are left
+    for grouped_aggregate to handle one at a time. unit resamples a date
+    x_col as in grouped_aggregate.
+    """
+    key = group_key(x_col, unit)
+    missing = [
+        y_col for y_col in y_cols
+        if y_col != x_col and pd.api.types.is_numeric_dtype(df[y_col]) and cache.get((version, key, y_col)) is None
+    ]
+    if not missing:
+        return
+    if unit is not None:
+        df = resampled_frame(df, x_col, missing, unit)
+    for y_col, stats in base_aggregates(df, x_col, missing).items():
+        cache.put((version, key, y_col), stats)
+
+
+def merge_partial_aggregates(partials):
+    """Combine sum/count/min/max frames computed over disjoint row sets"""
+    combined = pd.concat(partials)
+    merged = combined.groupby(level=0, observed=True).agg(
+        {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+    )
+    return merged
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch in the style of KLL
+
+    Level h holds sampled items that each stand for 2**h inputs. When a
+    level grows past k items it is sorted and every other item, starting at
+    a random offset, is promoted to the next level. Each such compaction
+    moves the rank of any value by 0 or +/-2**h with equal sign, so the
+    summed squares give a Hoeffding bound on the rank error of a quantile.
+    """
+
+    def __init__(self, k=QUANTILE_SKETCH_K, seed=None):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.variance = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        """Fold in a sketch built over other rows"""
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.variance += other.variance
+        self._compact()
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays at this level, so total weight is preserved
+                odd = len(items) % 2
+                promoted = items[:len(items) - odd][self._rng.integers(2)::2]
+                self.levels[h] = items[len(items) - odd:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.variance += 4.0 ** h
+            h += 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="mergesort")
+        cumulative = np.cumsum(weights[order])
+        i = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return items[order][min(i, len(items) - 1)]
+
+    def rank_error(self, confidence=STATS_CONFIDENCE):
+        """Bound on |estimated rank - true rank| / count at the given confidence"""
+        if self.count == 0:
+            return 0.0
+        return np.sqrt(2 * self.variance * np.log(2 / (1 - confidence))) / self.count
+
+
+def extend_aggregates(cache, version, new_rows):
+    """Fold rows appended to the data into the aggregates cached for its version
+
+    Cached sum/count/min/max frames are merged with the partial aggregates
+    of the new rows, so the cost depends on the new rows and the number of
+    groups, not on how much data was aggregated before. Entries that cannot
+    be extended that way (single-function fallbacks, histograms, summaries)
+    are dropped and recomputed on demand, as are aggregates of filtered
+    data, since appended rows can change which rows a filter keeps.
+    """
+    for key in cache.keys():
+        if key[0] != version:
+            if isinstance(key[0], tuple) and key[0][0] == version:
+                cache.discard(key)
+            continue
+        stats = cache.get(key)
+        if stats is None:
+            # Evicted by a merged entry put back larger earlier in this loop
+            continue
+        extendable = (
+            len(key) == 3 and list(stats.columns) == BASE_AGGREGATIONS
+            and key[1] in new_rows.columns and key[2] in new_rows.columns
+        )
+        if not extendable:
+            cache.discard(key)
+            continue
+        x_col, y_col = key[1], key[2]
+        try:
+            partial = new_rows.groupby(x_col, observed=True)[y_col].agg(BASE_AGGREGATIONS)
+        except TypeError:
+            cache.discard(key)
+            continue
+        cache.put(key, merge_partial_aggregates([stats, partial]).rename_axis(index=x_col))
+
+
+class StreamingStats:
+    """Count, mean, variance, min, max and median accumulated one chunk at a time
+
+    Chunks are merged with Chan's parallel update of Welford's moments, so
+    the result does not depend on how the data was split. The median comes
+    from a QuantileSketch and is approximate.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        self.sketch.update(values)
+
+    def summary(self):
+        """Statistics in the same shape as column_summary(), plus the median's error bound
+
+        median_error is the rank error as a fraction of count and
+        median_low/median_high the values at that distance either side, all
+        at STATS_CONFIDENCE.
+        """
+        error = self.sketch.rank_error()
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else np.nan,
+            'median': self.sketch.quantile(0.5),
+            'std': np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+            'min': self.min,
+            'max': self.max,
+            'median_error': error,
+            'median_low': self.sketch.quantile(max(0.5 - error, 0.0)),
+            'median_high': self.sketch.quantile(min(0.5 + error, 1.0)),
+        }
+
+
+class HistogramAccumulator:
+    """Fixed-size histogram whose range grows as data streams in
+
+    The first chunk sets the bin range. Values outside it double the bin
+    width, merging neighbouring bins pairwise, so memory stays at `bins`
+    counters no matter how much data is added.
+    """
+
+    def __init__(self, bins=20):
+        if bins % 2:
+            raise ValueError("bins must be even")
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        vmin, vmax = values.min(), values.max()
+        if self.lo is None:
+            self.lo = vmin
+            self.width = (vmax - vmin) / self.bins if vmax > vmin else 1.0
+        while vmin < self.lo:
+            self._grow(left=True)
+        while vmax > self.lo + self.width * self.bins:
+            self._grow(left=False)
+
+        idx = np.clip(((values - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+
+    def _grow(self, left):
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        empty = np.zeros(self.bins // 2, dtype=np.int64)
+        if left:
+            self.counts = np.concatenate([empty, merged])
+            self.lo -= self.width * self.bins
+        else:
+            self.counts = np.concatenate([merged, empty])
+        self.width *= 2
+
+    def result(self):
+        """(counts, edges) with empty bins at either end trimmed off"""
+        if self.lo is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(1)
+        nonzero = np.flatnonzero(self.counts)
+        first, last = nonzero[0], nonzero[-1] + 1
+        edges = self.lo + self.width * np.arange(self.bins + 1)
+        return self.counts[first:last], edges[first:last + 1]
+
+
+def plan_dashboard(specs):
+    """Group the Y columns of grouped chart specs by X column and resampling unit
+
+    Returns {(x_col, unit): [y_col, ...]} in first-seen order, so that every
+    X column is grouped once for all the charts that use it the same way.
+    unit is None for X columns that are not resampled. Histograms do not
+    group and are left out.
+    """
+    groups = {}
+    for spec in specs:
+        if spec['chart_type'] == "Histogram":
+            continue
+        y_cols = groups.setdefault((spec['x_col'], spec.get('resample')), [])
+        if spec['y_col'] not in y_cols:
+            y_cols.append(spec['y_col'])
+    return groups
+
+
+def _cached_stream_result(spec, cache, version):
+    """A streamed chart result rebuilt from the aggregation cache, or None"""
+    if cache is None:
+        return None
+    y_col = spec['y_col']
+    if spec['chart_type'] != "Histogram":
+        stats = cache.get((version, group_key(spec['x_col'], spec.get('resample')), y_col))
+        if stats is None:
+            return None
+        return {'data': select_aggregate(stats, y_col, spec['agg_func']), 'histogram': None, 'summary': None, 'rows': None}
+    bins = cache.get((version, y_col, "histogram"))
+    summary = cache.get((version, y_col, "summary", False))
+    if bins is None or summary is None:
+        return None
+    edges = np.append(bins['left'].to_numpy(), bins['right'].iloc[-1])
+    return {
+        'data': None,
+        'histogram': (bins['count'].to_numpy(), edges),
+        'summary': summary.to_dict("records")[0],
+        'rows': None,
+    }
+
+
+def stream_charts_data(filepath, specs, plan=None, cache=None, version=None, chunksize=CSV_CHUNK_ROWS,
+                       progress=None, cancel_event=None, filters=(), perf=None):
+    """Compute the data of several charts in one chunked scan of a CSV
+
+    Only the columns the specs use are parsed, each X column is grouped
+    once per chunk for all of its Y columns, and only per-group partial
+    aggregates (or histogram counters) are kept between chunks, so peak
+    memory depends on the chunk size and number of groups, never on the
+    file size. Returns one dict per spec with 'data' (grouped frame),
+    'histogram' ((counts, edges) for Histogram charts), 'summary' and
+    'rows'. Results already in the cache are not scanned for again.
+    Row-wise filters are applied to each chunk before it is grouped. perf
+    times the scan.
+    """
+    unsupported = [predicate for predicate in filters if predicate[1] not in ROW_FILTER_OPS]
+    if unsupported:
+        raise ValueError(f"Filter '{format_filters(unsupported)}' needs the file loaded in memory")
+    version = filtered_version(version, filters)
+    results = [_cached_stream_result(spec, cache, version) for spec in specs]
+    pending = [spec for spec, result in zip(specs, results) if result is None]
+    if not pending:
+        return results
+
+    groups = plan_dashboard(pending)
+    hist_cols = list(dict.fromkeys(spec['y_col'] for spec in pending if spec['chart_type'] == "Histogram"))
+    y_cols = list(dict.fromkeys([y for ys in groups.values() for y in ys] + hist_cols))
+    usecols = list(dict.fromkeys([x_col for x_col, _ in groups] + y_cols + filter_columns(filters)))
+    histograms = {y_col: HistogramAccumulator() for y_col in hist_cols}
+    moments = {y_col: StreamingStats() for y_col in hist_cols}
+    stats = {}
+    rows = 0
+    with perf_stage(perf, "scan", file=os.path.basename(filepath), charts=len(pending)) as record:
+        for chunk in iter_csv_chunks(filepath, plan, usecols=usecols, progress=progress,
+                                     cancel_event=cancel_event, chunksize=chunksize):
+            rows += len(chunk)
+            if filters:
+                chunk = chunk[filter_mask(chunk, filters)]
+            for y_col in y_cols:
+                values = chunk[y_col]
+                if not pd.api.types.is_numeric_dtype(values) and not values.isna().all():
+                    raise ValueError(f"Column '{y_col}' must be numeric for streaming aggregation")
+            for y_col in hist_cols:
+                values = chunk[y_col].to_numpy(dtype=float, na_value=np.nan)
+                histograms[y_col].update(values)
+                moments[y_col].update(values)
+            for (x_col, unit), group_y_cols in groups.items():
+                grouped = chunk if unit is None else resampled_frame(chunk, x_col, group_y_cols, unit)
+                partials = grouped.groupby(x_col, observed=True)[group_y_cols].agg(BASE_AGGREGATIONS)
+                key = group_key(x_col, unit)
+                for y_col in group_y_cols:
+                    previous = stats.get((key, y_col))
+                    partial = partials[y_col]
+                    stats[(key, y_col)] = partial if previous is None else merge_partial_aggregates([previous, partial])
+        record['rows'] = rows
+
+    for (x_col, unit), group_y_cols in groups.items():
+        key = group_key(x_col, unit)
+        for y_col in group_y_cols:
+            combined = stats.get((key, y_col))
+            if combined is None:
+                combined = pd.DataFrame(columns=BASE_AGGREGATIONS, index=pd.Index([], name=x_col))
+            combined = combined.sort_index().rename_axis(index=x_col, columns=None)
+            stats[(key, y_col)] = combined
+            if cache is not None:
+                cache.put((version, key, y_col), combined)
+    bins = {}
+    for y_col in hist_cols:
+        bins[y_col] = histograms[y_col].result()
+        moments[y_col] = moments[y_col].summary()
+        if cache is not None:
+            counts, edges = bins[y_col]
+            cache.put((version, y_col, "histogram"), pd.DataFrame({'left': edges[:-1], 'right': edges[1:], 'count': counts}))
+            cache.put((version, y_col, "summary", False), pd.DataFrame([moments[y_col]]))
+
+    for i, spec in enumerate(specs):
+        if results[i] is not None:
+            continue
+        y_col = spec['y_col']
+        if spec['chart_type'] == "Histogram":
+            results[i] = {'data': None, 'histogram': bins[y_col], 'summary': moments[y_col], 'rows': rows}
+        else:
+            data = select_aggregate(stats[(group_key(spec['x_col'], spec.get('resample')), y_col)], y_col, spec['agg_func'])
+            results[i] = {'data': data, 'histogram': None, 'summary': None, 'rows': rows}
+    return results
+
+
+def stream_chart_data(filepath, spec, plan=None, cache=None, version=None, chunksize=CSV_CHUNK_ROWS,
+                      progress=None, cancel_event=None, filters=(), perf=None):
+    """Compute one chart's data by scanning a CSV chunk by chunk (see stream_charts_data)"""
+    return stream_charts_data(
+        filepath, [spec], plan=plan, cache=cache, version=version, chunksize=chunksize,
+        progress=progress, cancel_event=cancel_event, filters=filters, perf=perf
+    )[0]
+
+
+def is_continuous(values):
+    """True for numeric (non-boolean) and datetime data that can be placed on a scale"""
+    if pd.api.types.is_bool_dtype(values):
+        return False
+    return pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)
+
+
+def minmax_indices(values, buckets):
+    """Positions of the minimum and maximum of each of `buckets` equal slices
+
+    Keeping both extremes per pixel column preserves the visual envelope of
+    a line. Returns a sorted position array, or None if values has no
+    numeric data to decimate on.
+    """
+    y = pd.to_numeric(pd.Series(values).reset_index(drop=True), errors="coerce")
+    positions = np.flatnonzero(y.notna().to_numpy())
+    if len(positions) == 0:
+        return None
+    bucket = positions * buckets // len(y)
+    grouped = y.iloc[positions].groupby(bucket)
+    return np.unique(np.concatenate([
+        grouped.idxmin().to_numpy(),
+        grouped.idxmax().to_numpy(),
+        positions[[0, -1]],
+    ]))
+
+
+def positional_axis(axis, labels):
+    """Label an axis plotted at 0..n-1 with the original (non-numeric) values"""
+    labels = list(labels)
+
+    def label_for(value, pos):
+        i = int(round(value))
+        return str(labels[i]) if 0 <= i < len(labels) else ""
+
+    axis.set_major_formatter(FuncFormatter(label_for))
+
+
+def chart_columns(specs, filters=()):
+    """Columns the given chart specs and filters read, in first-use order"""
+    columns = []
+    for spec in specs:
+        if spec['chart_type'] != "Histogram":
+            columns.append(spec['x_col'])
+        columns.append(spec['y_col'])
+    return list(dict.fromkeys(columns + filter_columns(filters)))
+
+
+def prepare_chart_data(df, spec, cache=None, version=None, filters=()):
+    """Compute the data a chart spec plots: grouped aggregates or the raw Y column
+
+    filters (see parse_filters) drop rows before grouping. Aggregates of
+    filtered data are cached under filtered_version(version, filters), so
+    the frame is only filtered when they are not cached yet.
+    """
+    y_col = spec['y_col']
+    unit = spec.get('resample')
+    if filters:
+        key_version = filtered_version(version, filters)
+        if spec['chart_type'] == "Histogram" or cache is None or \
+                cache.get((key_version, group_key(spec['x_col'], unit), y_col)) is None:
+            df = apply_filters(df, filters, columns=[spec['x_col'], y_col], cache=cache, version=version)
+        version = key_version
+    if spec['chart_type'] == "Histogram":
+        # Histogram only needs Y column
+        if not pd.api.types.is_numeric_dtype(df[y_col]):
+            raise ValueError(f"Column '{y_col}' must be numeric for histogram")
+        return df[[y_col]].dropna()
+    return grouped_aggregate(df, spec['x_col'], y_col, spec['agg_func'], cache=cache, version=version, unit=unit)
+
+
+def dashboard_chart_data(df, specs, cache=None, version=None, exact_stats=False, filters=()):
+    """Compute the data of several charts from a loaded frame, one grouping per X column
+
+    Returns one dict per spec shaped like stream_charts_data()'s results.
+    Histograms come back as precomputed bins and summary statistics rather
+    than the raw column, so every result is small enough to hand to render
+    worker processes. filters are applied once, before any grouping.
+    """
+    if cache is None:
+        cache = AggregationCache()
+    if filters:
+        df = apply_filters(df, filters, columns=chart_columns(specs), cache=cache, version=version)
+        version = filtered_version(version, filters)
+    for (x_col, unit), y_cols in plan_dashboard(specs).items():
+        aggregate_many(df, x_col, y_cols, cache, version, unit=unit)
+
+    results = []
+    for spec in specs:
+        data = prepare_chart_data(df, spec, cache=cache, version=version)
+        result = {'data': data, 'histogram': None, 'summary': None, 'rows': len(df)}
+        if spec['chart_type'] == "Histogram":
+            y_col = spec['y_col']
+            result['data'] = None
+            result['histogram'] = np.histogram(data[y_col], bins=20)
+            result['summary'] = summarize_column(data[y_col], exact=exact_stats, cache=cache, key=(version, y_col))
+        results.append(result)
+    return results
+
+
+def chart_title(spec):
+    """Short heading naming what a chart spec shows"""
+    if spec['chart_type'] == "Histogram":
+        return f"Histogram of {spec['y_col']}"
+    return f"{spec['chart_type']} chart: {spec['agg_func']} of {spec['y_col']} by {x_axis_label(spec)}"
+
+
+def x_axis_label(spec):
+    """The X column of a chart spec, with its resampling unit if it has one"""
+    if spec.get('resample'):
+        return f"{spec['x_col']} (per {spec['resample']})"
+    return spec['x_col']
+
+
+def chart_spec(chart_info):
+    """Just the chart spec keys of a chart info or result dict"""
+    return {key: chart_info.get(key) for key in SPEC_KEYS}
+
+
+def _decimated_xy(ax, x_data, y_data, idx):
+    """Select decimated points, keeping true spacing for non-numeric X"""
+    y_kept = y_data.iloc[idx]
+    if is_continuous(x_data):
+        return x_data.iloc[idx], y_kept
+    # Categorical X: plot by position so dropped points still take up space
+    positional_axis(ax.xaxis, x_data)
+    return idx, y_kept
+
+
+def _density_scatter(fig, ax, x_data, y_data, width_px):
+    """Draw a large scatter as hexbin density (or min/max points), return the chart note"""
+    if is_continuous(x_data) and is_continuous(y_data):
+        valid = x_data.notna() & y_data.notna()
+        x_values = x_data[valid]
+        is_date = pd.api.types.is_datetime64_any_dtype(x_values)
+        x_values = mdates.date2num(x_values) if is_date else x_values.astype(float)
+        gridsize = max(10, width_px // 10)
+        bins = ax.hexbin(x_values, y_data[valid].astype(float), gridsize=gridsize, mincnt=1, cmap='Oranges')
+        if is_date:
+            ax.xaxis_date()
+        fig.colorbar(bins, ax=ax, label="Points per bin")
+        return f"Density binned: {len(x_data):,} points in {gridsize} columns"
+
+    idx = minmax_indices(y_data, width_px)
+    if idx is None:
+        ax.scatter(x_data, y_data, color='#FF9800', alpha=0.7, s=100)
+        return None
+    x_plot, y_plot = _decimated_xy(ax, x_data, y_data, idx)
+    ax.scatter(x_plot, y_plot, color='#FF9800', alpha=0.7, s=20)
+    return f"Decimated: {len(x_data):,} → {len(idx):,} points (min/max per pixel)"
+
+
+def draw_chart(fig, spec, data, width_px=DEFAULT_CHART_WIDTH_PX, exact=False, histogram=None, perf=None):
+    """Draw a chart onto an empty Figure, returning (artist, decimation_note)
+
+    artist is the bar container, line or scatter collection that can be
+    updated in place later, or None for charts that are always redrawn.
+    Line and Scatter charts with more points than width_px can show are
+    decimated unless exact is set. histogram, if given, is a precomputed
+    (counts, edges) pair used instead of binning data. perf times the
+    layout pass.
+    """
+    x_col = spec['x_col']
+    y_col = spec['y_col']
+    agg_func = spec['agg_func']
+    chart_type = spec['chart_type']
+
+    ax = fig.add_subplot(111)
+    artist = None
+    decimation_note = None
+
+    if chart_type == "Histogram":
+        if histogram is not None:
+            counts, edges = histogram
+            ax.hist(edges[:-1], bins=edges, weights=counts, edgecolor='black', alpha=0.7)
+        else:
+            ax.hist(data[y_col], bins=20, edgecolor='black', alpha=0.7)
+        ax.set_xlabel(y_col)
+        ax.set_ylabel("Frequency")
+        ax.set_title(f"Histogram of {y_col}")
+    else:
+        x_data = data[x_col]
+        y_data = data[y_col]
+        unit = spec.get('resample')
+        x_label = x_axis_label(spec)
+        is_date = pd.api.types.is_datetime64_any_dtype(x_data)
+
+        # Generate appropriate chart
+        if chart_type == "Bar":
+            if unit and is_date:
+                # Each bar covers its time bin (less a gap), starting where the bin does
+                artist = ax.bar(x_data, y_data, width=RESAMPLE_SPANS[unit] * 0.8, align='edge', color='#2196F3', alpha=0.8)
+            else:
+                artist = ax.bar(x_data, y_data, color='#2196F3', alpha=0.8)
+            ax.set_xlabel(x_label)
+            ax.set_ylabel(f"{agg_func}({y_col})")
+            ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
+            setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+        elif chart_type == "Line":
+            marker = 'o'
+            if not exact and len(data) > LINE_POINTS_PER_PIXEL * width_px:
+                idx = minmax_indices(y_data, width_px)
+                if idx is not None:
+                    x_data, y_data = _decimated_xy(ax, x_data, y_data, idx)
+                    decimation_note = f"Decimated: {len(data):,} → {len(idx):,} points (min/max per pixel)"
+                    marker = None
+            artist, = ax.plot(x_data, y_data, marker=marker, color='#4CAF50', linewidth=2)
+            ax.set_xlabel(x_label)
+            ax.set_ylabel(f"{agg_func}({y_col})")
+            ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
+            setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+        elif chart_type == "Pie":
+            labels = x_data.dt.strftime(RESAMPLE_LABELS[unit]) if unit and is_date else x_data
+            ax.pie(y_data, labels=labels, autopct='%1.1f%%', startangle=90)
+            ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
+
+        elif chart_type == "Scatter":
+            if not exact and len(data) > SCATTER_POINTS_PER_PIXEL * width_px:
+                decimation_note = _density_scatter(fig, ax, x_data, y_data, width_px)
+            else:
+                artist = ax.scatter(x_data, y_data, color='#FF9800', alpha=0.7, s=100)
+            ax.set_xlabel(x_label)
+            ax.set_ylabel(f"{agg_func}({y_col})")
+            ax.set_title(f"{agg_func.capitalize()} of {y_col} by {x_col}")
+
+        if is_date and chart_type != "Pie":
+            # A date axis with as much of each date as the ticks need
+            locator = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+            setp(ax.xaxis.get_majorticklabels(), rotation=0, ha='center')
+
+    if decimation_note:
+        ax.text(
+            0.99, 0.01, decimation_note,
+            transform=ax.transAxes, ha='right', va='bottom', fontsize=8, color='#666666'
+        )
+        # A decimated artist does not hold the full data, so never update it in place
+        artist = None
+
+    with perf_stage(perf, "tight_layout"):
+        fig.tight_layout()
+    return artist, decimation_note
+
+
+def column_summary(values):
+    """Exact summary statistics of a numeric Series"""
+    return {
+        'count': int(values.count()),
+        'mean': values.mean(),
+        'median': values.median(),
+        'std': values.std(),
+        'min': values.min(),
+        'max': values.max(),
+    }
+
+
+def summarize_column(values, exact=False, cache=None, key=None):
+    """Summary statistics of a numeric Series, sketched when the column is large
+
+    Columns shorter than APPROX_STATS_MIN_ROWS, or any column when exact is
+    set, get the exact column_summary(). Larger ones take one pass through
+    StreamingStats instead of a full median and std. With a cache, results
+    are kept under key + ("summary", exact).
+    """
+    exact = exact or len(values) < APPROX_STATS_MIN_ROWS
+    cache_key = tuple(key) + ("summary", exact) if key is not None else None
+    cached = cache.get(cache_key) if cache is not None and cache_key is not None else None
+    if cached is not None:
+        return cached.to_dict("records")[0]
+
+    summary = column_summary(values) if exact else _sketch_column(values).summary()
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, pd.DataFrame([summary]))
+    return summary
+
+
+def _sketch_column(values):
+    """StreamingStats of a numeric Series, fed CSV_CHUNK_ROWS values at a time"""
+    moments = StreamingStats()
+    for start in range(0, len(values), CSV_CHUNK_ROWS):
+        chunk = values.iloc[start:start + CSV_CHUNK_ROWS]
+        moments.update(chunk.to_numpy(dtype=float, na_value=np.nan))
+    return moments
+
+
+def profile_column(values):
+    """Profile of one column: dtype, nulls, cardinality and, if numeric, range, moments and quantiles
+
+    Numeric statistics are those summarize_column() would give the non-null
+    values - exact below APPROX_STATS_MIN_ROWS, sketched above it - with
+    'exact' telling which. Datetime columns get their range as ISO strings.
+    Every value is a plain int, float, str or bool, so profiles can be
+    saved as JSON.
+    """
+    count = int(values.count())
+    profile = {
+        'dtype': str(values.dtype),
+        'count': count,
+        'nulls': int(len(values) - count),
+        'cardinality': int(values.nunique()),
+        'numeric': bool(pd.api.types.is_numeric_dtype(values)),
+    }
+    if pd.api.types.is_datetime64_any_dtype(values) and count:
+        profile['min'] = values.min().isoformat()
+        profile['max'] = values.max().isoformat()
+    if not profile['numeric']:
+        return profile
+
+    values = values.dropna()
+    if pd.api.types.is_bool_dtype(values):
+        values = values.astype(float)
+    profile['exact'] = len(values) < APPROX_STATS_MIN_ROWS
+    if profile['exact']:
+        summary = column_summary(values)
+        quantiles = values.quantile(list(PROFILE_QUANTILES)).tolist() if count else [np.nan] * len(PROFILE_QUANTILES)
+    else:
+        moments = _sketch_column(values)
+        summary = moments.summary()
+        quantiles = [moments.sketch.quantile(q) for q in PROFILE_QUANTILES]
+    for key, value in summary.items():
+        profile[key] = int(value) if key == 'count' else float(value)
+    profile['quantiles'] = [[q, float(value)] for q, value in zip(PROFILE_QUANTILES, quantiles)]
+    return profile
+
+
+def profile_summary(profile):
+    """The statistics of a numeric column profile in summarize_column()'s shape"""
+    keys = ('count', 'mean', 'median', 'std', 'min', 'max', 'median_error', 'median_low', 'median_high')
+    return {key: profile[key] for key in keys if key in profile}
+
+
+def dataset_profile(df, filepath=None, cache=None, cancel_event=None, perf=None):
+    """Column profiles of df as {column: profile_column(...)}, kept next to the cache entry
+
+    With a cache, profiles saved for filepath are reused as long as the row
+    count still matches, and those computed here are added to the saved
+    ones, so each column of a file is profiled once however it is loaded
+    (in lazy mode, column by column).
+    """
+    saved = {}
+    if cache is not None and filepath is not None:
+        stored = cache.load_profile(filepath)
+        if stored is not None and stored['rows'] == len(df):
+            saved = stored['columns']
+    profiles = {col: saved[col] for col in df.columns if col in saved}
+    missing = [col for col in df.columns if col not in profiles]
+    if not missing:
+        return profiles
+
+    with perf_stage(perf, "profile", rows=len(df), columns=missing):
+        for col in missing:
+            if cancel_event is not None and cancel_event.is_set():
+                raise OperationCancelled()
+            profiles[col] = profile_column(df[col])
+    if cache is not None and filepath is not None:
+        try:
+            cache.store_profile(filepath, len(df), {**saved, **profiles})
+        except OSError:
+            # Like the cache itself, the saved profile is only an optimisation
+            pass
+    return profiles
+
+
+def seed_profile_summaries(cache, version, profiles):
+    """Put numeric column profiles where summarize_column() looks for cached statistics
+
+    The entries stand for the unfiltered columns of data version version,
+    so Histogram statistics of a profiled column cost nothing.
+    """
+    for col, profile in profiles.items():
+        if profile['numeric'] and profile['count']:
+            cache.put((version, col, "summary", profile['exact']), pd.DataFrame([profile_summary(profile)]))
+
+
+def describe_median_error(summary):
+    """Human-readable error bound of an approximate median, or None if it is exact"""
+    error = summary.get('median_error')
+    if error is None or pd.isna(error):
+        return None
+    return (
+        f"within {error:.2%} of rank at {STATS_CONFIDENCE:.0%} confidence: "
+        f"between {summary['median_low']:.2f} and {summary['median_high']:.2f}"
+    )
+
+
+def chart_insights(chart_info):
+    """Generate insights based on a chart's configuration and data"""
+    insights = []
+    data = chart_info['data']
+
+    try:
+        if chart_info['chart_type'] == "Histogram":
+            # Histogram insights
+            y_col = chart_info['y_col']
+            summary = chart_info.get('summary') or column_summary(data[y_col])
+            mean_val = summary['mean']
+            median_val = summary['median']
+            std_val = summary['std']
+
+            insights.append(f"The average {y_col} is {mean_val:.2f} with a standard deviation of {std_val:.2f}")
+            error_note = describe_median_error(summary)
+            if error_note is None:
+                insights.append(f"The median {y_col} is {median_val:.2f}, indicating the central tendency of the distribution")
+            else:
+                insights.append(f"The median {y_col} is approximately {median_val:.2f} ({error_note})")
+
+            if mean_val > median_val * 1.1:
+                insights.append(f"The distribution is right-skewed, with higher values pulling the average up")
+            elif median_val > mean_val * 1.1:
+                insights.append(f"The distribution is left-skewed, with lower values pulling the average down")
+            else:
+                insights.append(f"The distribution appears relatively symmetric")
+
+        else:
+            # Other chart types
+            x_col = chart_info['x_col']
+            y_col = chart_info['y_col']
+            agg_func = chart_info['agg_func']
+
+            # Find top and bottom performers
+            if len(data) > 0:
+                sorted_data = data.sort_values(by=y_col, ascending=False)
+                top_item = sorted_data.iloc[0]
+                bottom_item = sorted_data.iloc[-1]
+
+                insights.append(f"'{top_item[x_col]}' has the highest {agg_func} {y_col} of {top_item[y_col]:.2f}")
+                insights.append(f"'{bottom_item[x_col]}' has the lowest {agg_func} {y_col} of {bottom_item[y_col]:.2f}")
+
+                # Calculate total and average
+                total = data[y_col].sum()
+                avg = data[y_col].mean()
+
+                insights.append(f"Total {agg_func} across all categories: {total:.2f}")
+                insights.append(f"Average {agg_func} per category: {avg:.2f}")
+
+                # Top contributor percentage
+                if total > 0:
+                    top_percentage = (top_item[y_col] / total) * 100
+                    insights.append(f"'{top_item[x_col]}' contributes {top_percentage:.1f}% of the total")
+
+                # Comparison insight
+                if len(data) >= 2:
+                    difference = top_item[y_col] - bottom_item[y_col]
+                    insights.append(f"There is a difference of {difference:.2f} between the highest and lowest values")
+
+    except Exception as e:
+        insights.append("Analysis data unavailable for current configuration")
+
+    return insights
+
+
+def chart_statistics(chart_info):
+    """Generate statistical summary table rows for a chart"""
+    stats_data = [["Metric", "Value"]]
+    data = chart_info['data']
+
+    try:
+        if chart_info['chart_type'] == "Histogram":
+            y_col = chart_info['y_col']
+            summary = chart_info.get('summary') or column_summary(data[y_col])
+            error_note = describe_median_error(summary)
+            stats_data.append(["Mean", f"{summary['mean']:.2f}"])
+            if error_note is None:
+                stats_data.append(["Median", f"{summary['median']:.2f}"])
+            else:
+                stats_data.append(["Median (approx.)", f"{summary['median']:.2f}"])
+                stats_data.append(["Median rank error", f"±{summary['median_error']:.2%} ({STATS_CONFIDENCE:.0%} confidence)"])
+                stats_data.append(["Median range", f"{summary['median_low']:.2f} to {summary['median_high']:.2f}"])
+            stats_data.append(["Std Dev", f"{summary['std']:.2f}"])
+            stats_data.append(["Min", f"{summary['min']:.2f}"])
+            stats_data.append(["Max", f"{summary['max']:.2f}"])
+            stats_data.append(["Count", f"{summary['count']}"])
+        else:
+            y_col = chart_info['y_col']
+            stats_data.append(["Total Sum", f"{data[y_col].sum():.2f}"])
+            stats_data.append(["Average", f"{data[y_col].mean():.2f}"])
+            stats_data.append(["Median", f"{data[y_col].median():.2f}"])
+            stats_data.append(["Min Value", f"{data[y_col].min():.2f}"])
+            stats_data.append(["Max Value", f"{data[y_col].max():.2f}"])
+            stats_data.append(["Number of Categories", f"{len(data)}"])
+
+    except Exception as e:
+        stats_data.append(["Error", "Statistics unavailable"])
+
+    return stats_data
+
+
+def report_progress_callback(progress, cancel_event=None):
+    """Adapt ReportLab's build callbacks to progress(fraction, message)
+
+    Raising OperationCancelled from the callback is the only way to stop
+    doc.build part way, so cancellation is checked here too.
+    """
+    state = {'total': 1}
+
+    def callback(kind, value):
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled()
+        if progress is None:
+            return
+        if kind == "SIZE_EST":
+            state['total'] = max(value, 1)
+        elif kind == "PROGRESS":
+            progress(value / state['total'], "Building report...")
+        elif kind == "PAGE":
+            progress(None, f"Building report: page {value}")
+
+    return callback
+
+
+def _report_header(styles, title_text, dataset_name, total_records):
+    """Title and dataset metadata flowables that open a report"""
+    elements = []
+
+    # Title
+    title = Paragraph(f"<b>{title_text}</b>", styles['Title'])
+    elements.append(title)
+    elements.append(Spacer(1, 12))
+
+    # Report metadata
+    metadata_text = f"""
+    <b>Dataset:</b> {dataset_name}<br/>
+    <b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>
+    <b>Total Records:</b> {total_records}<br/>
+    """
+    metadata = Paragraph(metadata_text, styles['Normal'])
+    elements.append(metadata)
+    elements.append(Spacer(1, 20))
+    return elements
+
+
+def _chart_elements(chart_info, styles, doc, chart_image=None, max_image_height=0.5):
+    """Flowables describing one chart: configuration, image, insights and statistics
+
+    The image is scaled to the text width, but no taller than
+    max_image_height of the text height.
+    """
+    elements = []
+
+    # Chart Configuration Section
+    chart_config_title = Paragraph("<b>Chart Configuration</b>", styles['Heading2'])
+    elements.append(chart_config_title)
+    elements.append(Spacer(1, 8))
+
+    config_text = f"""
+    <b>Chart Type:</b> {chart_info['chart_type']}<br/>
+    <b>X-Axis:</b> {x_axis_label(chart_info)}<br/>
+    <b>Y-Axis:</b> {chart_info['y_col']}<br/>
+    <b>Aggregation:</b> {chart_info['agg_func']}<br/>
+    """
+    if chart_info.get('filters'):
+        config_text += f"<b>Filters:</b> {escape(format_filters(chart_info['filters']))}<br/>"
+    config = Paragraph(config_text, styles['Normal'])
+    elements.append(config)
+    elements.append(Spacer(1, 20))
+
+    # The chart itself, scaled to the text width
+    if chart_image is not None:
+        source = io.BytesIO(chart_image) if isinstance(chart_image, bytes) else chart_image
+        image_width, image_height = ImageReader(source).getSize()
+        width = doc.width
+        height = min(width * image_height / image_width, doc.height * max_image_height)
+        width = height * image_width / image_height
+        if isinstance(source, io.BytesIO):
+            source.seek(0)
+        elements.append(Image(source, width=width, height=height))
+        elements.append(Spacer(1, 20))
+
+    # Data Analysis Section
+    analysis_title = Paragraph("<b>Data Analysis & Insights</b>", styles['Heading2'])
+    elements.append(analysis_title)
+    elements.append(Spacer(1, 8))
+
+    # Generate insights based on chart type and data
+    insights = chart_insights(chart_info)
+
+    for insight in insights:
+        insight_para = Paragraph(f"• {insight}", styles['Normal'])
+        elements.append(insight_para)
+        elements.append(Spacer(1, 6))
+
+    elements.append(Spacer(1, 20))
+
+    # Statistical Summary Section
+    stats_title = Paragraph("<b>Statistical Summary</b>", styles['Heading2'])
+    elements.append(stats_title)
+    elements.append(Spacer(1, 8))
+
+    # Generate statistics
+    stats_data = chart_statistics(chart_info)
+
+    # Create statistics table
+    stats_table = Table(stats_data, colWidths=[200, 150])
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(stats_table)
+    return elements
+
+
+def build_report(filepath, chart_info, dataset_name, total_records, chart_image=None,
+                 progress=None, cancel_event=None):
+    """Write the PDF analysis report for one chart
+
+    chart_image is the already rendered chart (PNG bytes or a file path) to
+    embed; it is not re-rendered here. progress is called as
+    progress(fraction, message), with fraction None for page updates.
+    """
+    # Create PDF
+    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    doc.setProgressCallBack(report_progress_callback(progress, cancel_event))
+    styles = getSampleStyleSheet()
+
+    elements = _report_header(styles, "Data Analysis Report", dataset_name, total_records)
+    elements.extend(_chart_elements(chart_info, styles, doc, chart_image))
+
+    # Build PDF
+    doc.build(elements)
+
+
+class DashboardDocTemplate(SimpleDocTemplate):
+    """Document template that lists every chart heading in the table of contents"""
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Paragraph) and flowable.style.name == "Heading1":
+            self.notify("TOCEntry", (0, flowable.getPlainText(), self.page))
+
+
+def build_dashboard_report(filepath, charts, dataset_name, total_records, progress=None, cancel_event=None):
+    """Write one PDF with a table of contents and a section per chart
+
+    Each chart info must carry its rendered 'image'. The document is built
+    twice (multiBuild) so the contents can show page numbers.
+    """
+    doc = DashboardDocTemplate(filepath, pagesize=A4)
+    doc.setProgressCallBack(report_progress_callback(progress, cancel_event))
+    styles = getSampleStyleSheet()
+
+    elements = _report_header(styles, "Dashboard Report", dataset_name, total_records)
+    elements.append(Paragraph("<b>Contents</b>", styles['Heading2']))
+    elements.append(TableOfContents())
+    for number, chart_info in enumerate(charts, 1):
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"{number}. {chart_title(chart_info)}", styles['Heading1']))
+        # Small enough that a chart and its tables usually share one page
+        elements.extend(_chart_elements(chart_info, styles, doc, chart_info.get('image'), max_image_height=0.25))
+
+    doc.multiBuild(elements)
+
+
+def parse_chart_spec(text):
+    """Parse an X:Y:AGG:TYPE[:UNIT] chart spec from the command line
+
+    UNIT, one of RESAMPLE_UNITS, resamples a date X column.
+    """
+    resample = None
+    parts = text.rsplit(":", 4)
+    if len(parts) == 5 and parts[4].lower() in RESAMPLE_UNITS:
+        resample = parts.pop().lower()
+        text = ":".join(parts)
+    parts = text.rsplit(":", 3)
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError(f"chart spec '{text}' is not X:Y:AGG:TYPE[:UNIT]")
+    x_col, y_col, agg_func, chart_type = parts
+    chart_type = chart_type.capitalize()
+    if agg_func not in AGG_FUNCS:
+        raise argparse.ArgumentTypeError(f"unknown aggregation '{agg_func}' (choose from {', '.join(AGG_FUNCS)})")
+    if chart_type not in CHART_TYPES:
+        raise argparse.ArgumentTypeError(f"unknown chart type '{chart_type}' (choose from {', '.join(CHART_TYPES)})")
+    if not y_col or (not x_col and chart_type != "Histogram"):
+        raise argparse.ArgumentTypeError(f"chart spec '{text}' needs both X and Y columns")
+    if resample is not None and chart_type == "Histogram":
+        raise argparse.ArgumentTypeError(f"chart spec '{text}': a Histogram has no X column to resample")
+    return {'x_col': x_col, 'y_col': y_col, 'agg_func': agg_func, 'chart_type': chart_type, 'resample': resample}
+
+
+def _filter_argument(text):
+    try:
+        return parse_filters(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def output_stem(csv_path, spec):
+    """File name stem for the outputs of one CSV and chart spec"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    parts = [stem, spec['x_col'], spec['y_col'], spec['agg_func'], spec['chart_type'], spec.get('resample')]
+    return "_".join("".join(c if c.isalnum() or c in "-." else "_" for c in part) for part in parts if part)
+
+
+def render_chart_image(spec, data, path, dpi=REPORT_IMAGE_DPI, histogram=None, exact=False, perf=None):
+    """Render a chart to a PNG file (or binary file object) with the Agg backend"""
+    rows = len(data) if data is not None else None
+    with perf_stage(perf, "render image", rows=rows, chart=chart_title(spec)):
+        fig = Figure(figsize=(6, 5), dpi=100)
+        FigureCanvasAgg(fig)
+        draw_chart(fig, spec, data, exact=exact, histogram=histogram, perf=perf)
+        fig.savefig(path, dpi=dpi, format="png")
+
+
+def _chart_png(spec, data, histogram, exact, perf=None):
+    buffer = io.BytesIO()
+    render_chart_image(spec, data, buffer, histogram=histogram, exact=exact, perf=perf)
+    return buffer.getvalue()
+
+
+def render_chart_pngs(charts, jobs=None, exact=False, progress=None, cancel_event=None, perf=None):
+    """Render the images of several charts in worker processes, returned in chart order
+
+    Workers are spawned rather than forked because the caller may be a
+    threaded GUI process. progress is called as progress(done, total).
+    Workers time their charts into perf's log, if it has one.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        futures = [
+            pool.submit(
+                _chart_png,
+                chart_spec(chart),
+                chart['data'], chart.get('histogram'), exact,
+                perf if perf is not None and perf.log_path else None
+            )
+            for chart in charts
+        ]
+        images = []
+        for future in futures:
+            if cancel_event is not None and cancel_event.is_set():
+                pool.shutdown(cancel_futures=True)
+                raise OperationCancelled()
+            images.append(future.result())
+            if progress is not None:
+                progress(len(images), len(futures))
+    return images
+
+
+def render_dashboard(output, specs, dataset_name, df=None, csv_path=None, plan=None, cache=None, version=None,
+                     exact=False, exact_stats=False, jobs=None, progress=None, cancel_event=None, filters=(),
+                     perf=None):
+    """Compute, render and assemble many charts into one PDF with a table of contents
+
+    Charts come from the loaded frame df or, when df is None, from one
+    streamed scan of csv_path. Either way each X column is grouped once for
+    all of its charts, after filters are applied. progress is called as
+    progress(fraction, message); perf times each step. Returns the list of
+    chart infos, each with its 'image'.
+    """
+    def report(fraction, message):
+        if progress is not None:
+            progress(fraction, message)
+
+    report(0.0, f"Aggregating {len(specs)} charts...")
+    if df is not None:
+        with perf_stage(perf, "aggregate", rows=len(df), charts=len(specs)):
+            results = dashboard_chart_data(
+                df, specs, cache=cache, version=version, exact_stats=exact_stats, filters=filters
+            )
+        total_records = len(df)
+    else:
+        def scan_progress(bytes_read, total, rows):
+            report(0.4 * bytes_read / total if total else 0.4, f"Scanning: {rows:,} rows")
+
+        results = stream_charts_data(
+            csv_path, specs, plan=plan, cache=cache, version=version,
+            progress=scan_progress, cancel_event=cancel_event, filters=filters, perf=perf
+        )
+        known_rows = [result['rows'] for result in results if result['rows'] is not None]
+        total_records = max(known_rows) if known_rows else "Unknown"
+    charts = [dict(spec, filters=filters, **result) for spec, result in zip(specs, results)]
+
+    def render_progress(done, total):
+        report(0.4 + 0.4 * done / total, f"Rendering charts: {done} of {total}")
+
+    with perf_stage(perf, "render images", charts=len(charts)):
+        images = render_chart_pngs(
+            charts, jobs=jobs, exact=exact, progress=render_progress, cancel_event=cancel_event, perf=perf
+        )
+    for chart, image in zip(charts, images):
+        chart['image'] = image
+
+    def build_progress(fraction, message):
+        if fraction is not None:
+            report(0.8 + 0.2 * fraction, message)
+
+    with perf_stage(perf, "report build", charts=len(charts), file=os.path.basename(output)):
+        build_dashboard_report(
+            output, charts, dataset_name, total_records, progress=build_progress, cancel_event=cancel_event
+        )
+    return charts
+
+
+def render_outputs(csv_path, specs, output, use_cache=True, force_reparse=False, stream=None, exact_stats=False,
+                   filters=(), perf=None):
+    """Load one CSV and write a chart image and PDF report per spec
+
+    output is a directory, or a .pdf path when there is a single spec.
+    stream=None streams files too large for memory and loads the rest.
+    exact_stats computes exact Histogram statistics for loaded files of any
+    size; streamed files always get sketched ones, and all of their specs
+    are computed in a single scan. filters are pushed down into the
+    columnar cache and applied before aggregation. perf times every stage.
+    Returns the list of report paths written.
+    """
+    if stream is None:
+        stream = should_stream(csv_path)
+    agg_cache = AggregationCache()
+    if stream:
+        df = None
+        _, plan = load_preview(csv_path, perf=perf)
+        total_records = None
+    else:
+        cache = FrameCache() if use_cache else None
+        columns = [spec['x_col'] for spec in specs if spec['x_col']] + [spec['y_col'] for spec in specs]
+        df, _ = load_dataset(
+            csv_path, cache=cache, force_reparse=force_reparse, columns=columns, filters=filters, perf=perf
+        )
+        if filters:
+            with perf_stage(perf, "filter", rows=len(df)):
+                df = apply_filters(df, filters, cache=agg_cache)
+            total_records = f"{len(df):,} (after filters)"
+        else:
+            total_records = len(df)
+            # Statistics saved by an earlier profile of the file are reused as is
+            stored = cache.load_profile(csv_path) if cache is not None else None
+            if stored is not None and stored['rows'] == len(df):
+                seed_profile_summaries(agg_cache, None, stored['columns'])
+
+    if stream:
+        # One pass over the file for every chart, however many there are
+        streamed = stream_charts_data(csv_path, specs, plan=plan, cache=agg_cache, filters=filters, perf=perf)
+        total_records = next((result['rows'] for result in streamed if result['rows']), total_records)
+
+    reports = []
+    for i, spec in enumerate(specs):
+        if stream:
+            result = streamed[i]
+        else:
+            with perf_stage(perf, "aggregate", rows=len(df), chart=chart_title(spec)):
+                result = {'data': prepare_chart_data(df, spec, cache=agg_cache)}
+            if spec['chart_type'] == "Histogram":
+                y_col = spec['y_col']
+                result['summary'] = summarize_column(
+                    result['data'][y_col], exact=exact_stats, cache=agg_cache, key=(None, y_col)
+                )
+        chart_info = dict(spec, filters=filters, **result)
+        if output.lower().endswith(".pdf"):
+            report_path = output
+        else:
+            report_path = os.path.join(output, output_stem(csv_path, spec) + ".pdf")
+        # The PNG written next to the report is also the image embedded in it
+        image_path = os.path.splitext(report_path)[0] + ".png"
+        render_chart_image(spec, result['data'], image_path, histogram=result.get('histogram'), perf=perf)
+        with perf_stage(perf, "report build", chart=chart_title(spec), file=os.path.basename(report_path)):
+            build_report(report_path, chart_info, os.path.basename(csv_path), total_records, chart_image=image_path)
+        reports.append(report_path)
+    return reports
+
+
+def _warm_cache(csv_path, force_reparse, perf=None):
+    load_dataset(csv_path, cache=FrameCache(), force_reparse=force_reparse, perf=perf)
+    return csv_path
+
+
+def run_batch(csv_paths, specs, output, jobs=None, use_cache=True, force_reparse=False, stream=None,
+              exact_stats=False, filters=(), perf=None):
+    """Render every spec for every CSV in a process pool
+
+    Yields (csv_path, report_paths, error) as tasks finish. With the
+    columnar cache available each loaded file is parsed once up front and
+    the per-chart tasks then memory-map it; otherwise each task handles one
+    file and all of its specs. Streamed files are always one task per file
+    so that specs sharing columns share a scan.
+    """
+    if not output.lower().endswith(".pdf"):
+        os.makedirs(output, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        tasks = []
+        warm = {}
+        for path in csv_paths:
+            streamed = stream if stream is not None else should_stream(path)
+            if not streamed and use_cache and FrameCache().enabled and len(specs) > 1:
+                warm[path] = pool.submit(_warm_cache, path, force_reparse, perf)
+            else:
+                tasks.append((path, specs, force_reparse, streamed))
+
+        # Parse every loaded file once, then fan its charts out over the cache
+        for path, future in warm.items():
+            try:
+                future.result()
+            except Exception as e:
+                yield path, [], e
+                continue
+            tasks.extend((path, [spec], False, False) for spec in specs)
+
+        futures = [
+            (path, pool.submit(
+                render_outputs, path, task_specs, output, use_cache, reparse, streamed, exact_stats, filters, perf
+            ))
+            for path, task_specs, reparse, streamed in tasks
+        ]
+        for path, future in futures:
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                yield path, [], e
+
+
+def run_dashboards(csv_paths, specs, output, jobs=None, use_cache=True, force_reparse=False, stream=None,
+                   exact_stats=False, filters=(), perf=None):
+    """Write one dashboard PDF holding every spec for each CSV
+
+    Files are handled one after another; the charts of each file are
+    rendered in parallel. Yields (csv_path, report_paths, error) like
+    run_batch().
+    """
+    if not output.lower().endswith(".pdf"):
+        os.makedirs(output, exist_ok=True)
+
+    for csv_path in csv_paths:
+        if output.lower().endswith(".pdf"):
+            report_path = output
+        else:
+            stem = os.path.splitext(os.path.basename(csv_path))[0]
+            report_path = os.path.join(output, f"{stem}_dashboard.pdf")
+        try:
+            streamed = stream if stream is not None else should_stream(csv_path)
+            if streamed:
+                df = None
+                _, plan = load_preview(csv_path, perf=perf)
+            else:
+                cache = FrameCache() if use_cache else None
+                columns = [spec['x_col'] for spec in specs if spec['x_col']] + [spec['y_col'] for spec in specs]
+                df, _ = load_dataset(
+                    csv_path, cache=cache, force_reparse=force_reparse, columns=columns, filters=filters, perf=perf
+                )
+                plan = None
+            render_dashboard(
+                report_path, specs, os.path.basename(csv_path), df=df, csv_path=csv_path, plan=plan,
+                cache=AggregationCache(), exact_stats=exact_stats, jobs=jobs, filters=filters, perf=perf
+            )
+        except Exception as e:
+            yield csv_path, [], e
+            continue
+        yield csv_path, [report_path], None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render charts and PDF analysis reports from CSV files without a GUI."
+    )
+    parser.add_argument("csv", nargs="+", help="CSV files to process")
+    parser.add_argument(
+        "-c", "--chart", action="append", required=True, type=parse_chart_spec, metavar="X:Y:AGG:TYPE[:UNIT]",
+        help="chart to render, e.g. region:revenue:sum:Bar or date:revenue:sum:Line:day to resample a date X "
+             f"column ({', '.join(RESAMPLE_UNITS)}) (repeatable; X may be empty for Histogram)"
+    )
+    parser.add_argument("-o", "--output", required=True, help="output directory, or a .pdf path for a single chart")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the columnar cache")
+    parser.add_argument("--force-reparse", action="store_true", help="ignore cached frames and parse the CSVs again")
+    parser.add_argument(
+        "--stream", action="store_true", default=None,
+        help="aggregate out-of-core in bounded memory (default: only for files too large for RAM)"
+    )
+    parser.add_argument(
+        "--exact-stats", action="store_true",
+        help=f"exact Histogram median and std even above {APPROX_STATS_MIN_ROWS:,} rows (default: sketched)"
+    )
+    parser.add_argument(
+        "-f", "--filter", type=_filter_argument, default=(), metavar="FILTERS",
+        help="only use rows matching these ';'-separated filters, e.g. \"region == North; amount > 100\""
+    )
+    parser.add_argument(
+        "--dashboard", action="store_true",
+        help="put all charts of a CSV into one PDF with a table of contents"
+    )
+    parser.add_argument(
+        "--perf-log", default=os.environ.get(PERF_LOG_ENV), metavar="FILE",
+        help=f"append per-stage timings to FILE as JSON lines (default: ${PERF_LOG_ENV})"
+    )
+    parser.add_argument(
+        "--perf-memory", action="store_true",
+        help="also record each stage's peak memory in the timing log (slower)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.output.lower().endswith(".pdf") and (len(args.csv) > 1 or (len(args.chart) > 1 and not args.dashboard)):
+        parser.error("a .pdf output needs exactly one CSV and one chart (or --dashboard); pass a directory instead")
+
+    failed = False
+    runner = run_dashboards if args.dashboard else run_batch
+    for csv_path, reports, error in runner(
+        args.csv, args.chart, args.output,
+        jobs=args.jobs, use_cache=not args.no_cache, force_reparse=args.force_reparse, stream=args.stream,
+        exact_stats=args.exact_stats, filters=args.filter,
+        perf=PerfRecorder(args.perf_log, trace_memory=args.perf_memory) if args.perf_log else None
+    ):
+        if error is not None:
+            failed = True
+            print(f"{csv_path}: {error}", file=sys.stderr)
+        for report in reports:
+            print(report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Rows appended by the watcher are folded into cached aggregates"""
+import numpy as np
+import pandas as pd
+
+import engine
+
+
+def test_extend_aggregates_survives_evictions():
+    rng = np.random.default_rng(5)
+    y_cols = [f"y{i}" for i in range(8)]
+    old = pd.DataFrame({'k': rng.integers(0, 50, 2_000), **{y: rng.random(2_000) for y in y_cols}})
+    # New groups make every merged entry larger than the one it replaces
+    new = pd.DataFrame({'k': rng.integers(0, 100, 500), **{y: rng.random(500) for y in y_cols}})
+
+    entries = {y: old.groupby('k', observed=True)[y].agg(engine.BASE_AGGREGATIONS) for y in y_cols}
+    sizes = [int(frame.memory_usage(deep=True).sum()) for frame in entries.values()]
+    # Exactly full, so each put of a merged entry evicts the oldest ones, which are still to be extended
+    cache = engine.AggregationCache(max_bytes=sum(sizes))
+    for y, frame in entries.items():
+        cache.put((1, 'k', y), frame)
+    assert len(cache) == len(y_cols)
+
+    engine.extend_aggregates(cache, 1, new)
+
+    both = pd.concat([old, new], ignore_index=True)
+    assert 0 < len(cache) < len(y_cols)
+    for key in cache.keys():
+        expected = both.groupby('k', observed=True)[key[2]].agg(engine.BASE_AGGREGATIONS)
+        pd.testing.assert_frame_equal(cache.get(key), expected, check_dtype=False)
+    assert cache.current_bytes <= cache.max_bytes
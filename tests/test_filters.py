@@ -0,0 +1,53 @@
+"""Filters pushed down into the Feather cache must select the rows pandas selects"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+
+FILTERS = [
+    "region != n",
+    "rev != 3",
+    "region != n; rev != 3",
+    "region == s",
+    "rev > 2",
+    "rev <= 2",
+    "region in n, s",
+    "rev between 1 and 3",
+    "when >= 2024-01-10",
+]
+
+
+@pytest.fixture
+def csv_with_nulls(tmp_path):
+    rng = np.random.default_rng(11)
+    rows = 400
+    rev = rng.integers(0, 6, rows).astype(float)
+    rev[rng.random(rows) < 0.2] = np.nan
+    region = rng.choice(["n", "s", "e", "w"], rows).astype(object)
+    region[rng.random(rows) < 0.2] = None
+    when = pd.Series(pd.date_range("2024-01-01", periods=rows, freq="h"))
+    when[rng.random(rows) < 0.2] = pd.NaT
+    path = tmp_path / "nulls.csv"
+    pd.DataFrame({'region': region, 'rev': rev, 'when': when}).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("text", FILTERS)
+def test_cached_and_uncached_loads_match(tmp_path, csv_with_nulls, text):
+    filters = engine.parse_filters(text)
+    cache = engine.FrameCache(directory=str(tmp_path / "cache"))
+    if not cache.enabled:
+        pytest.skip("pyarrow is not installed")
+
+    uncached, from_cache = engine.load_dataset(csv_with_nulls, cache=None)
+    assert not from_cache
+    expected = engine.apply_filters(uncached, filters)
+
+    engine.load_dataset(csv_with_nulls, cache=cache)
+    cached, from_cache = engine.load_dataset(csv_with_nulls, cache=cache, filters=filters)
+    assert from_cache
+    got = engine.apply_filters(cached, filters)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True))
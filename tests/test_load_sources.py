@@ -0,0 +1,50 @@
+"""Multi-file loads share the columnar cache with single-file loads"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+
+
+@pytest.fixture
+def shards(tmp_path):
+    rng = np.random.default_rng(3)
+    # Alone, b.csv would make 'code' a category and 'day' a date; the shared
+    # plan comes from a.csv, where 'code' is too varied and 'day' is not a date
+    a = pd.DataFrame({'code': [f"c{i}" for i in range(300)], 'day': ["n/a"] * 300, 'v': rng.random(300)})
+    b = pd.DataFrame({
+        'code': rng.choice(["x", "y"], 300),
+        'day': pd.date_range("2024-01-01", periods=300, freq="D").strftime("%Y-%m-%d"),
+        'v': rng.random(300),
+    })
+    paths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    a.to_csv(paths[0], index=False)
+    b.to_csv(paths[1], index=False)
+    return paths
+
+
+def test_single_file_load_keeps_its_own_typing_after_a_multi_file_load(tmp_path, shards):
+    cache = engine.FrameCache(directory=str(tmp_path / "cache"))
+    if not cache.enabled:
+        pytest.skip("pyarrow is not installed")
+    fresh = engine.ingest_csv(shards[1])
+    assert isinstance(fresh['code'].dtype, pd.CategoricalDtype)
+
+    engine.load_sources(shards, cache=cache, jobs=1)
+    single, from_cache = engine.load_dataset(shards[1], cache=cache)
+    assert from_cache
+    pd.testing.assert_frame_equal(single, fresh)
+
+
+def test_multi_file_load_is_the_same_from_the_cache(tmp_path, shards):
+    cache = engine.FrameCache(directory=str(tmp_path / "cache"))
+    if not cache.enabled:
+        pytest.skip("pyarrow is not installed")
+    parsed, cached = engine.load_sources(shards, cache=cache, source_column=engine.SOURCE_COLUMN, jobs=1)
+    assert cached == 0
+    again, cached = engine.load_sources(shards, cache=cache, source_column=engine.SOURCE_COLUMN, jobs=1)
+    assert cached == len(shards)
+    uncached, _ = engine.load_sources(shards, source_column=engine.SOURCE_COLUMN, jobs=1)
+    pd.testing.assert_frame_equal(again, parsed)
+    pd.testing.assert_frame_equal(uncached, parsed)
+    assert not isinstance(parsed['code'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,62 @@
+"""The parallel groupby must give exactly what a plain pandas groupby gives"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+
+ROWS = 20_000
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    """Send every groupby through the worker pool, even on a single-core machine"""
+    monkeypatch.setattr(engine, "PARALLEL_GROUPBY_MIN_ROWS", 1_000)
+    monkeypatch.setattr(engine, "PARALLEL_GROUPBY_WORKERS", 2)
+    monkeypatch.setattr(engine, "_groupby_pool", None)
+    yield
+    if engine._groupby_pool is not None:
+        engine._groupby_pool.shutdown()
+
+
+def make_frame(keys):
+    rng = np.random.default_rng(7)
+    floats = rng.normal(size=ROWS) * 1e6
+    floats[rng.random(ROWS) < 0.1] = np.nan
+    return pd.DataFrame({
+        'key': keys(rng),
+        'small': rng.integers(-100, 100, ROWS).astype(np.int8),
+        'real': floats,
+        'flag': rng.random(ROWS) < 0.3,
+    })
+
+
+KEYS = {
+    # "unused" never occurs: observed=True must leave it out
+    'categorical': lambda rng: pd.Categorical(
+        rng.choice(["north", "south", "east", "west"], ROWS), categories=["north", "south", "east", "west", "unused"]
+    ),
+    'string': lambda rng: pd.Series(rng.choice(["a", "b", "c", None], ROWS), dtype=object),
+    'datetime': lambda rng: pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 500, ROWS), unit="h"),
+    'int': lambda rng: rng.integers(0, 1_000, ROWS),
+}
+
+
+@pytest.mark.parametrize("key", list(KEYS))
+def test_parallel_matches_pandas(parallel, key):
+    df = make_frame(KEYS[key])
+    y_cols = ['small', 'real', 'flag']
+    assert engine.use_parallel_groupby(df, 'key', y_cols)
+
+    results = engine.parallel_base_aggregates(df, 'key', y_cols)
+    for y_col in y_cols:
+        expected = df.groupby('key', observed=True)[y_col].agg(engine.BASE_AGGREGATIONS)
+        pd.testing.assert_frame_equal(results[y_col], expected, check_exact=True)
+
+
+def test_base_aggregates_takes_the_parallel_path(parallel):
+    df = make_frame(KEYS['int'])
+    results = engine.base_aggregates(df, 'key', ['real'])
+    assert engine._groupby_pool is not None
+    expected = df.groupby('key', observed=True)['real'].agg(engine.BASE_AGGREGATIONS)
+    pd.testing.assert_frame_equal(results['real'], expected, check_exact=True)